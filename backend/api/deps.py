@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 from fastapi import Depends
 
 from backend.core.database import get_db
-from backend.services import ClassService, ProfessorService, UserService, ScheduleService
+from backend.services import ClassService, ProfessorService, UserService, ScheduleService, PrerequisiteService, PlannerService
 from backend.repositories import ClassRepository, UserRepository, ScheduleRepository
 
 # Repositories
@@ -19,10 +19,22 @@ def get_schedule_repository() -> ScheduleRepository:
 def get_professor_service() -> ProfessorService:
     return ProfessorService()
 
-def get_class_service(
+def get_prerequisite_service(
     class_repo: ClassRepository = Depends(get_class_repository)
+) -> PrerequisiteService:
+    return PrerequisiteService(class_repo=class_repo)
+
+def get_class_service(
+    class_repo: ClassRepository = Depends(get_class_repository),
+    prerequisite_service: PrerequisiteService = Depends(get_prerequisite_service)
 ) -> ClassService:
-    return ClassService(class_repo=class_repo)
+    return ClassService(class_repo=class_repo, prerequisite_service=prerequisite_service)
+
+def get_planner_service(
+    class_service: ClassService = Depends(get_class_service),
+    prerequisite_service: PrerequisiteService = Depends(get_prerequisite_service)
+) -> PlannerService:
+    return PlannerService(class_service=class_service, prerequisite_service=prerequisite_service)
 
 def get_user_service(
     user_repo: UserRepository = Depends(get_user_repository),
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from backend.api.deps import get_class_service, get_db
-from backend.schemas import ClassDetail, DepartmentListResponse, ClassListResponse
+from backend.schemas import ClassDetail, DepartmentListResponse, ClassListResponse, AutocompleteResponse
 from backend.services import ClassService
 from backend.config import settings
 
@@ -19,6 +19,18 @@ async def get_departments(
     departments = class_service.get_all_departments_with_counts(db, semester)
     return {"departments": departments}
 
+@router.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete_classes(
+    q: str,
+    semester: Optional[str] = None,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    class_service: ClassService = Depends(get_class_service)
+):
+    # Served from the in-memory prefix index; the session only connects when the index is (re)built
+    suggestions = class_service.get_autocomplete_suggestions(db, q, semester, limit)
+    return {"suggestions": suggestions}
+
 @router.get("", response_model=ClassListResponse)
 async def get_classes(
     subject: Optional[str] = None,
@@ -26,18 +38,38 @@ async def get_classes(
     semester: Optional[str] = None,
     limit: Optional[int] = 500,
     page: Optional[int] = 1,
+    gen_ed: Optional[List[str]] = Query(None, alias="genEd"),
+    credits: Optional[List[int]] = Query(None),
+    class_type: Optional[List[str]] = Query(None, alias="type"),
+    delivery: Optional[List[str]] = Query(None),
+    open_seats: Optional[bool] = Query(None, alias="openSeats"),
+    instructor: Optional[List[str]] = Query(None),
+    completed: Optional[List[str]] = Query(None),
+    facets: bool = False,
     db: Session = Depends(get_db),
     class_service: ClassService = Depends(get_class_service)
 ):
     limit = settings.max_classes_per_request
 
+    filters = {
+        "genEd": gen_ed,
+        "credits": credits,
+        "type": class_type,
+        "delivery": delivery,
+        "openSeats": [open_seats] if open_seats is not None else None,
+        "instructor": instructor,
+    }
+
     result = class_service.get_classes(
         db=db,
         subject=subject,
         search=search,
         semester=semester,
         limit=limit,
-        page=page
+        page=page,
+        filters=filters,
+        include_facets=facets,
+        completed=completed
     )
     return result
 
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from backend.api.deps import get_planner_service, get_db
+from backend.schemas import PlanRequest, PlanResponse
+from backend.services import PlannerService
+
+router = APIRouter(prefix="/planner", tags=["planner"])
+
+@router.post("", response_model=PlanResponse)
+async def build_plan(
+    request: PlanRequest,
+    db: Session = Depends(get_db),
+    planner_service: PlannerService = Depends(get_planner_service)
+):
+    return planner_service.build_plan(
+        db,
+        targets=request.targets,
+        completed=request.completed,
+        max_credits_per_term=request.max_credits_per_term,
+        start_semester=request.start_semester,
+        include_summers=request.include_summers,
+        catalog_semester=request.catalog_semester
+    )
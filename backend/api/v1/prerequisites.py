@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from backend.api.deps import get_prerequisite_service, get_db
+from backend.schemas import PrerequisiteChainResponse, UnlockedCoursesResponse, PrerequisiteCyclesResponse
+from backend.services import PrerequisiteService
+
+router = APIRouter(prefix="/prerequisites", tags=["prerequisites"])
+
+@router.get("/cycles", response_model=PrerequisiteCyclesResponse)
+async def get_prerequisite_cycles(
+    semester: Optional[str] = None,
+    db: Session = Depends(get_db),
+    prerequisite_service: PrerequisiteService = Depends(get_prerequisite_service)
+):
+    return {"cycles": prerequisite_service.get_cycles(db, semester)}
+
+@router.get("/{subject}/{number}", response_model=PrerequisiteChainResponse)
+async def get_prerequisite_chain(
+    subject: str,
+    number: str,
+    semester: Optional[str] = None,
+    db: Session = Depends(get_db),
+    prerequisite_service: PrerequisiteService = Depends(get_prerequisite_service)
+):
+    return prerequisite_service.get_prerequisite_chain(db, subject, number, semester)
+
+@router.get("/{subject}/{number}/unlocks", response_model=UnlockedCoursesResponse)
+async def get_unlocked_courses(
+    subject: str,
+    number: str,
+    semester: Optional[str] = None,
+    db: Session = Depends(get_db),
+    prerequisite_service: PrerequisiteService = Depends(get_prerequisite_service)
+):
+    return prerequisite_service.get_unlocked_courses(db, subject, number, semester)
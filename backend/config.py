@@ -21,6 +21,11 @@ class Settings(BaseSettings):
     fuzzy_match_threshold: int = Field(default=70, ge=0, le=100)
     max_classes_per_request: int = Field(default=50000)
     skip_ratings_threshold: int = Field(default=500)
+    catalog_index_ttl_seconds: int = Field(default=300)
+    max_facet_values: int = Field(default=50)
+    max_autocomplete_results: int = Field(default=20)
+    search_cache_size: int = Field(default=512)
+    max_plan_terms: int = Field(default=16)
     api_title: str = Field(default="OU Class Manager API")
     api_version: str = Field(default="1.0.0")
     debug: bool = Field(default=False)
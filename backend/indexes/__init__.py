@@ -0,0 +1,20 @@
+from .registry import SemesterIndexRegistry
+from .snapshot import SemesterSnapshot
+from .facet_index import FacetIndex, FACET_DIMENSIONS, to_bitmap, match_course_code
+from .prefix_index import PrefixIndex
+from .text_index import TextIndex
+from .prerequisite_graph import PrerequisiteGraph
+from .eligibility_index import EligibilityIndex
+
+__all__ = [
+    "SemesterIndexRegistry",
+    "SemesterSnapshot",
+    "FacetIndex",
+    "FACET_DIMENSIONS",
+    "to_bitmap",
+    "match_course_code",
+    "PrefixIndex",
+    "TextIndex",
+    "PrerequisiteGraph",
+    "EligibilityIndex",
+]
@@ -0,0 +1,63 @@
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .facet_index import to_bitmap
+from .prerequisite_graph import CourseKey, PrerequisiteGraph
+
+# Corequisites can be taken in the same term, so they never block enrollment
+NON_BLOCKING_TYPES = frozenset({"concurrent", "corequisite"})
+
+
+class EligibilityIndex:
+    """Prerequisites compiled to bitset clauses over course ids, evaluated per course and applied per section.
+
+    Every course's requirement is an AND of clauses; an "or" clause needs any bit of its mask in
+    the transcript, any other clause needs all of them.
+    """
+
+    def __init__(self, graph: PrerequisiteGraph, rows: Sequence[Any]):
+        self.course_ids = graph.course_ids
+
+        section_positions: Dict[CourseKey, List[int]] = {}
+        for pos, row in enumerate(rows):
+            section_positions.setdefault((row.subject, row.courseNumber), []).append(pos)
+
+        self.size = len(rows)
+        unconstrained: List[int] = []
+        self.constrained: List[Tuple[Tuple[Tuple[int, bool], ...], int]] = []
+
+        for course, positions in section_positions.items():
+            clauses = []
+            for group in graph.direct_prerequisites(course):
+                if group["type"] in NON_BLOCKING_TYPES:
+                    continue
+                mask = 0
+                for prereq in group["courses"]:
+                    if prereq != course:
+                        mask |= 1 << self.course_ids[prereq]
+                if mask:
+                    clauses.append((mask, group["type"] == "or"))
+            if clauses:
+                self.constrained.append((tuple(clauses), to_bitmap(positions, self.size)))
+            else:
+                unconstrained.extend(positions)
+
+        self.unconstrained_mask = to_bitmap(unconstrained, self.size)
+
+    def transcript_mask(self, completed: Iterable[CourseKey]) -> int:
+        mask = 0
+        for course in completed:
+            course_id = self.course_ids.get(course)
+            if course_id is not None:
+                mask |= 1 << course_id
+        return mask
+
+    def eligible_mask(self, completed: Iterable[CourseKey]) -> int:
+        transcript = self.transcript_mask(completed)
+        eligible = self.unconstrained_mask
+        for clauses, sections in self.constrained:
+            for mask, any_of in clauses:
+                if (transcript & mask) == 0 if any_of else (transcript & mask) != mask:
+                    break
+            else:
+                eligible |= sections
+        return eligible
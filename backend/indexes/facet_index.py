@@ -0,0 +1,119 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+FACET_DIMENSIONS = ("genEd", "credits", "type", "delivery", "openSeats", "instructor")
+
+
+def to_bitmap(positions: Iterable[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, "little")
+
+
+def match_course_code(search: str) -> Optional[Tuple[str, str]]:
+    """Split a query like "ECE 2214" into (subject, number); None for free-text queries."""
+    course_pattern = re.match(r'^([A-Z]+(?:\s+[A-Z]+)?)\s+(\d+[A-Z]?)$', search.upper().strip())
+    if course_pattern:
+        return course_pattern.group(1).strip(), course_pattern.group(2).strip()
+    return None
+
+
+def iter_positions(mask: int) -> Iterable[int]:
+    bits = format(mask, "b")[::-1]
+    pos = bits.find("1")
+    while pos != -1:
+        yield pos
+        pos = bits.find("1", pos + 1)
+
+
+class FacetIndex:
+    """Bitmap index over one semester's classes; bit i corresponds to rows[i]."""
+
+    def __init__(self, rows: Sequence[Any]):
+        self.rows = rows
+        self.size = len(rows)
+        self.all_mask = (1 << self.size) - 1
+
+        positions: Dict[str, Dict[Any, List[int]]] = {dim: {} for dim in FACET_DIMENSIONS}
+        subject_positions: Dict[str, List[int]] = {}
+        for i, row in enumerate(rows):
+            subject_positions.setdefault(row.subject, []).append(i)
+            for dim, value in self._row_values(row).items():
+                if value is not None and value != "":
+                    positions[dim].setdefault(value, []).append(i)
+
+        self.bitmaps = {
+            dim: {value: to_bitmap(pos, self.size) for value, pos in values.items()}
+            for dim, values in positions.items()
+        }
+        self.subject_bitmaps = {subject: to_bitmap(pos, self.size) for subject, pos in subject_positions.items()}
+
+    @staticmethod
+    def _row_values(row: Any) -> Dict[str, Any]:
+        return {
+            "genEd": row.genEd,
+            "credits": row.credits,
+            "type": row.type,
+            "delivery": row.delivery,
+            "openSeats": (row.availableSeats or 0) > 0,
+            "instructor": row.instructor,
+        }
+
+    def dimension_mask(self, dim: str, values: Iterable[Any]) -> int:
+        mask = 0
+        bitmaps = self.bitmaps[dim]
+        for value in values:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def subject_mask(self, subject: str) -> int:
+        # Same semantics as the SQL path: case-insensitive substring match on subject
+        needle = subject.lower()
+        mask = 0
+        for code, bitmap in self.subject_bitmaps.items():
+            if code and needle in code.lower():
+                mask |= bitmap
+        return mask
+
+    def course_code_mask(self, subject: str, course_number: str) -> int:
+        matches = (i for i, row in enumerate(self.rows) if row.subject == subject and row.courseNumber == course_number)
+        return to_bitmap(matches, self.size)
+
+    def dimension_masks(self, filters: Dict[str, Sequence[Any]]) -> Dict[str, int]:
+        """Return one mask per active filter; values are OR'd within a dimension, dimensions are AND'd later."""
+        return {dim: self.dimension_mask(dim, values) for dim, values in filters.items() if values}
+
+    def count_facets(self, base_mask: int, dimension_masks: Dict[str, int], max_values: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        # Disjunctive faceting: each dimension's counts ignore that dimension's own selection
+        facets = {}
+        for dim in FACET_DIMENSIONS:
+            mask = base_mask
+            for other, other_mask in dimension_masks.items():
+                if other != dim:
+                    mask &= other_mask
+            counts = []
+            for value, bitmap in self.bitmaps[dim].items():
+                count = (mask & bitmap).bit_count()
+                if count:
+                    counts.append({"value": str(value).lower() if isinstance(value, bool) else str(value), "count": count})
+            counts.sort(key=lambda c: (-c["count"], c["value"]))
+            facets[dim] = counts[:max_values] if max_values else counts
+        return facets
+
+    @staticmethod
+    def combine(base_mask: int, dimension_masks: Dict[str, int]) -> int:
+        mask = base_mask
+        for dim_mask in dimension_masks.values():
+            mask &= dim_mask
+        return mask
+
+    def page(self, mask: int, limit: int, offset: int) -> List[Any]:
+        result = []
+        for n, pos in enumerate(iter_positions(mask)):
+            if n < offset:
+                continue
+            if len(result) >= limit:
+                break
+            result.append(self.rows[pos])
+        return result
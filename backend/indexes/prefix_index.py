@@ -0,0 +1,79 @@
+import heapq
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Prefixes this short match thousands of keys, so their answers are precomputed at build time
+SHORT_PREFIX_LENGTH = 3
+KIND_ORDER = {"course": 0, "instructor": 1}
+
+
+def normalize(text: str) -> str:
+    return " ".join(TOKEN_RE.findall(text.lower()))
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over course codes, title tokens and instructor names."""
+
+    def __init__(self, rows: Sequence[Any], max_results: int = 20):
+        self.max_results = max_results
+        suggestions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        keyed: Dict[str, set] = {}
+
+        def add(kind: str, value: str, label: Optional[str], keys: List[str]):
+            suggestion = suggestions.get((kind, value))
+            if suggestion is None:
+                suggestion = suggestions[(kind, value)] = {"type": kind, "value": value, "label": label, "count": 0}
+            suggestion["count"] += 1
+            for key in keys:
+                if key:
+                    keyed.setdefault(key, set()).add((kind, value))
+
+        for row in rows:
+            code = f"{row.subject} {row.courseNumber}"
+            norm_code = normalize(code)
+            title_tokens = TOKEN_RE.findall((row.title or "").lower())
+            add("course", code, row.title or "", [norm_code, norm_code.replace(" ", ""), normalize(row.title or "")] + title_tokens)
+
+            if row.instructor and row.instructor != "TBA":
+                norm_name = normalize(row.instructor)
+                add("instructor", row.instructor, None, [norm_name] + norm_name.split())
+
+        # Suggestions are ranked once, so a suggestion's position is its rank and lower is better
+        self._suggestions = sorted(suggestions.values(), key=lambda s: (-s["count"], KIND_ORDER[s["type"]], s["value"]))
+        rank = {(s["type"], s["value"]): i for i, s in enumerate(self._suggestions)}
+
+        # Each key keeps only its best max_results ranks: no prefix answer can need more from one key
+        self._keys = sorted(keyed)
+        self._key_ranks = [heapq.nsmallest(max_results, (rank[target] for target in keyed[key])) for key in self._keys]
+
+        self._short_prefixes: Dict[str, List[Dict[str, Any]]] = {}
+        for length in range(1, SHORT_PREFIX_LENGTH + 1):
+            for prefix in {key[:length] for key in self._keys if len(key) >= length}:
+                self._short_prefixes[prefix] = self._top(*self._range(prefix), max_results)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _top(self, lo: int, hi: int, limit: int) -> List[Dict[str, Any]]:
+        # Merge the keys' sorted rank lists lazily, stopping at `limit` distinct suggestions
+        ranks: List[int] = []
+        for position in heapq.merge(*self._key_ranks[lo:hi]):
+            if not ranks or position != ranks[-1]:
+                ranks.append(position)
+                if len(ranks) == limit:
+                    break
+        return [self._suggestions[position] for position in ranks]
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = min(limit, self.max_results)
+        if prefix in self._short_prefixes:
+            return self._short_prefixes[prefix][:limit]
+        return self._top(*self._range(prefix), limit)
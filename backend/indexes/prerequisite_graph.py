@@ -0,0 +1,155 @@
+from functools import cached_property
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .facet_index import iter_positions
+
+CourseKey = Tuple[str, str]
+
+
+class PrerequisiteGraph:
+    """Course-level prerequisite graph for one semester with precomputed closures in both directions.
+
+    Edges point from a course to the courses it requires. The heuristic description parser can
+    produce cycles, so closures are computed over strongly connected components and the cycles
+    are kept for reporting.
+    """
+
+    def __init__(self, courses: Iterable[CourseKey], prerequisite_rows: Iterable[Tuple[str, str, str, str, str, int]]):
+        self.courses: Set[CourseKey] = set(courses)
+        self.groups: Dict[CourseKey, Dict[int, Dict]] = {}
+        self.edges: Dict[CourseKey, Set[CourseKey]] = {}
+        self.reverse_edges: Dict[CourseKey, Set[CourseKey]] = {}
+        self.self_loops: Set[CourseKey] = set()
+
+        for subject, number, prereq_subject, prereq_number, prereq_type, group in prerequisite_rows:
+            course, prereq = (subject, number), (prereq_subject, prereq_number)
+            self.courses.update((course, prereq))
+
+            course_groups = self.groups.setdefault(course, {})
+            group_data = course_groups.setdefault(group or 1, {"type": prereq_type or "required", "courses": []})
+            if prereq not in group_data["courses"]:
+                group_data["courses"].append(prereq)
+
+            if prereq == course:
+                self.self_loops.add(course)
+                continue
+            self.edges.setdefault(course, set()).add(prereq)
+            self.reverse_edges.setdefault(prereq, set()).add(course)
+
+        components = self._strongly_connected_components()
+        self.cycles: List[List[CourseKey]] = sorted(
+            [sorted(component) for component in components if len(component) > 1]
+            + [[course] for course in sorted(self.self_loops)]
+        )
+
+        # Tarjan emits a component only after everything it requires, which doubles as a topological rank.
+        # Course ids follow that order, so walking a closure bitset yields courses foundation-first.
+        self._components = components
+        self.topological_rank = {course: i for i, component in enumerate(components) for course in component}
+        self.order: List[CourseKey] = [course for component in components for course in sorted(component)]
+        self.course_ids: Dict[CourseKey, int] = {course: i for i, course in enumerate(self.order)}
+
+        self._required = self._closures(self.edges, range(len(components)))
+        self._unlocked = self._closures(self.reverse_edges, range(len(components) - 1, -1, -1))
+
+    @cached_property
+    def dependent_depths(self) -> Dict[CourseKey, int]:
+        """Length of the longest chain of courses that build on each course; used to prioritise planning."""
+        component_of = self.topological_rank
+        depths = [0] * len(self._components)
+        # Dependents are always emitted after their prerequisites, so walk components backwards
+        for i in range(len(self._components) - 1, -1, -1):
+            for course in self._components[i]:
+                for dependent in self.reverse_edges.get(course, ()):
+                    j = component_of[dependent]
+                    if j != i:
+                        depths[i] = max(depths[i], depths[j] + 1)
+        return {course: depths[component_of[course]] for course in self.courses}
+
+    def _closures(self, edges, processing_order) -> List[int]:
+        component_of = self.topological_rank
+        closures = [0] * len(self._components)
+        for i in processing_order:
+            reached = 0
+            for course in self._components[i]:
+                for target in edges.get(course, ()):
+                    reached |= 1 << self.course_ids[target]
+                    target_component = component_of[target]
+                    if target_component != i:
+                        reached |= closures[target_component]
+            closures[i] = reached
+        return closures
+
+    def _expand(self, mask: int) -> List[CourseKey]:
+        return [self.order[pos] for pos in iter_positions(mask)]
+
+    def chain_mask(self, course: CourseKey) -> int:
+        return self._required[self.topological_rank[course]] & ~(1 << self.course_ids[course])
+
+    def chain(self, course: CourseKey) -> List[CourseKey]:
+        """Every course transitively required by `course`, foundations first."""
+        return self._expand(self.chain_mask(course))
+
+    def unlocks(self, course: CourseKey) -> List[CourseKey]:
+        """Every course that transitively requires `course`."""
+        return self._expand(self._unlocked[self.topological_rank[course]] & ~(1 << self.course_ids[course]))
+
+    def _strongly_connected_components(self) -> List[List[CourseKey]]:
+        # Iterative Tarjan; prerequisite chains can be deeper than the recursion limit allows
+        index: Dict[CourseKey, int] = {}
+        lowlink: Dict[CourseKey, int] = {}
+        on_stack: Set[CourseKey] = set()
+        stack: List[CourseKey] = []
+        components: List[List[CourseKey]] = []
+        counter = 0
+
+        for root in sorted(self.courses):
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.edges.get(root, ()))))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.edges.get(child, ())))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        return components
+
+    def direct_prerequisites(self, course: CourseKey) -> List[Dict]:
+        return [
+            {"group": group, "type": data["type"], "courses": list(data["courses"])}
+            for group, data in sorted(self.groups.get(course, {}).items())
+        ]
+
+    def direct_unlocks(self, course: CourseKey) -> List[CourseKey]:
+        return sorted(self.reverse_edges.get(course, ()))
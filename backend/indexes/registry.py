@@ -0,0 +1,38 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class SemesterIndexRegistry:
+    """Process-wide cache of per-semester in-memory indexes, rebuilt after a TTL."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, semester: str, build: Callable[[], Any]) -> Any:
+        index = self._get_fresh(semester)
+        if index is not None:
+            return index
+
+        # Only one request rebuilds a semester; the rest wait and reuse its result
+        with self._lock:
+            index = self._get_fresh(semester)
+            if index is None:
+                index = build()
+                self._entries[semester] = (time.monotonic(), index)
+            return index
+
+    def invalidate(self, semester: Optional[str] = None):
+        with self._lock:
+            if semester is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(semester, None)
+
+    def _get_fresh(self, semester: str) -> Optional[Any]:
+        entry = self._entries.get(semester)
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
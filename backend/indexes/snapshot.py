@@ -0,0 +1,27 @@
+import threading
+from typing import Any, Callable, Dict
+
+from .facet_index import FacetIndex
+
+
+class SemesterSnapshot:
+    """One build of a semester's rows plus the indexes derived from them. Derived indexes store row
+    positions into `facets.rows`, so they live and expire with this snapshot and are built lazily on it."""
+
+    def __init__(self, facets: FacetIndex):
+        self.facets = facets
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def derived(self, name: str, build: Callable[[FacetIndex], Any]) -> Any:
+        index = self._derived.get(name)
+        if index is not None:
+            return index
+
+        # Only one request builds each derived index; the rest wait and reuse it
+        with self._lock:
+            index = self._derived.get(name)
+            if index is None:
+                index = build(self.facets)
+                self._derived[name] = index
+            return index
@@ -0,0 +1,159 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+# Title hits matter most; descriptions are long and mention many topics in passing
+FIELD_WEIGHTS = {"title": 3.0, "code": 2.0, "instructor": 2.0, "genEd": 1.5, "description": 1.0}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TYPO_MIN_SIMILARITY = 0.3
+TYPO_MIN_LENGTH = 4
+TYPO_MAX_EXPANSIONS = 3
+TYPO_PENALTY = 0.8
+# The last query word may still be being typed, so it also matches vocabulary terms it starts
+PREFIX_MIN_LENGTH = 2
+PREFIX_MAX_EXPANSIONS = 20
+PREFIX_PENALTY = 0.9
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TextIndex:
+    """BM25-ranked inverted index over one semester's classes; doc ids are row positions."""
+
+    def __init__(self, rows: Sequence[Any], descriptions: Dict[str, Optional[str]], cache_size: int = 512):
+        self.size = len(rows)
+        self.postings: Dict[str, Dict[int, float]] = {}
+        doc_lengths = []
+
+        for doc, row in enumerate(rows):
+            fields = {
+                "title": row.title,
+                "code": f"{row.subject} {row.courseNumber}",
+                "instructor": row.instructor,
+                "genEd": row.genEd,
+                "description": descriptions.get(row.id),
+            }
+            length = 0.0
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    postings = self.postings.setdefault(token, {})
+                    postings[doc] = postings.get(doc, 0.0) + weight
+                    length += weight
+            doc_lengths.append(length)
+
+        self.doc_lengths = doc_lengths
+        self.avg_length = (sum(doc_lengths) / self.size) if self.size else 0.0
+        self.idf = {
+            term: math.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+        self.vocabulary = sorted(self.postings)
+        self.trigram_postings: Dict[str, List[str]] = {}
+        for term in self.postings:
+            for gram in trigrams(term):
+                self.trigram_postings.setdefault(gram, []).append(term)
+
+        # A query made only of stopwords has nothing to rank on; it falls back to a substring match on
+        # the fields the plain SQL search looks at, one line per field so matches can't span two
+        self.plain_text = [f"{row.title or ''}\n{row.subject}\n{row.courseNumber}".lower() for row in rows]
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def search(self, query: str) -> List[int]:
+        """Return matching row positions, best match first."""
+        tokens = tokenize(query)
+        text = query.strip().lower()
+        key = " ".join(tokens) if tokens else f"\0{text}"
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        if tokens:
+            result = self._search(tokens)
+        else:
+            result = [doc for doc, plain in enumerate(self.plain_text) if text and text in plain]
+
+        with self._cache_lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _search(self, tokens: List[str]) -> List[int]:
+        scores: Dict[int, float] = {}
+        matched_terms: Dict[int, int] = {}
+
+        last = tokens[-1]
+        for token in dict.fromkeys(tokens):
+            term_scores: Dict[int, float] = {}
+            for term, boost in self._expand(token, prefix=token == last):
+                idf = self.idf[term]
+                for doc, tf in self.postings[term].items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / self.avg_length)
+                    score = boost * idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    if score > term_scores.get(doc, 0.0):
+                        term_scores[doc] = score
+            for doc, score in term_scores.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+                matched_terms[doc] = matched_terms.get(doc, 0) + 1
+
+        # Prefer documents that contain every query term; fall back to any-term matches
+        required = len(dict.fromkeys(tokens))
+        docs = [doc for doc, count in matched_terms.items() if count == required] or list(scores)
+        docs.sort(key=lambda doc: (-scores[doc], doc))
+        return docs
+
+    def _expand(self, token: str, prefix: bool = False) -> List[Tuple[str, float]]:
+        expansions = [(token, 1.0)] if token in self.postings else []
+        if prefix and len(token) >= PREFIX_MIN_LENGTH:
+            expansions.extend((term, PREFIX_PENALTY) for term in self._prefix_terms(token))
+        if expansions:
+            return expansions
+        if len(token) < TYPO_MIN_LENGTH:
+            return []
+
+        # Typo tolerance: nearest vocabulary terms by trigram Jaccard similarity
+        grams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for term in self.trigram_postings.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        candidates = []
+        for term, overlap in shared.items():
+            if abs(len(term) - len(token)) > 2:
+                continue
+            similarity = overlap / (len(grams) + len(trigrams(term)) - overlap)
+            if similarity >= TYPO_MIN_SIMILARITY:
+                candidates.append((term, similarity))
+        candidates.sort(key=lambda c: (-c[1], c[0]))
+        return [(term, TYPO_PENALTY * similarity) for term, similarity in candidates[:TYPO_MAX_EXPANSIONS]]
+
+    def _prefix_terms(self, token: str) -> List[str]:
+        # Vocabulary terms that extend token, the most widely used first
+        start = bisect.bisect_right(self.vocabulary, token)
+        end = bisect.bisect_left(self.vocabulary, token + "\uffff", start)
+        return heapq.nlargest(PREFIX_MAX_EXPANSIONS, self.vocabulary[start:end], key=lambda term: (len(self.postings[term]), term))
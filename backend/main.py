@@ -9,10 +9,12 @@ from backend.logging_config import setup_logging
 from backend.api.v1 import (
     classes as classes_v1,
     professors as professors_v1,
+    prerequisites as prerequisites_v1,
+    planner as planner_v1,
     schedules as schedules_v1
 )
 from backend.core.exceptions import NotFoundException, ConflictException, ValidationException
-from database.models import create_engine_and_session, Base
+from database.models import create_engine_and_session, ensure_schema
 from backend.auth.firebase_config import initialize_firebase
 
 logger = setup_logging()
@@ -25,7 +27,7 @@ async def lifespan(app: FastAPI):
         logger.info("Starting database initialization...")
         engine, SessionLocal = create_engine_and_session()
         logger.info("Engine created, creating tables...")
-        Base.metadata.create_all(bind=engine)
+        ensure_schema(engine)
         logger.info("Tables created successfully!")
     except Exception as e:
         logger.error(f"Initialization failed: {e}")
@@ -57,6 +59,8 @@ async def validation_handler(request: Request, exc: ValidationException):
 # API v1 Routers
 app.include_router(classes_v1.router, prefix="/api")
 app.include_router(professors_v1.router, prefix="/api")
+app.include_router(prerequisites_v1.router, prefix="/api")
+app.include_router(planner_v1.router, prefix="/api")
 app.include_router(schedules_v1.router, prefix="/api")
 
 # Root endpoint
@@ -1,11 +1,13 @@
 from .base_repository import BaseRepository
-from .class_repository import ClassRepository
+from .class_repository import ClassRepository, ClassListRow, ClassIndexRow
 from .schedule_repository import ScheduleRepository
 from .user_repository import UserRepository
 
 __all__ = [
     "BaseRepository",
     "ClassRepository",
+    "ClassListRow",
+    "ClassIndexRow",
     "ScheduleRepository",
     "UserRepository",
 ]
@@ -1,11 +1,44 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
-from typing import List, Optional
+from typing import Dict, List, Optional
+import json
 import re
 
 from database.models import Class, Prerequisite
 from .base_repository import BaseRepository
 
+# Columns needed by BaseClassDTO; everything else (description, examInfo, ...) stays in the DB
+CLASS_LIST_COLUMNS = (
+    "id", "subject", "courseNumber", "title", "instructor", "credits", "time",
+    "location", "days", "availableSeats", "totalSeats", "genEd", "type",
+)
+
+# Extra columns the in-memory semester indexes filter on
+CLASS_INDEX_COLUMNS = CLASS_LIST_COLUMNS + ("delivery",)
+
+# Sections the scraper archived after they dropped out of the listing stay in the table for saved
+# schedules, but are left out of every listing, count and index
+LIVE_CLASS = Class.archivedAt.is_(None)
+
+
+class ClassListRow:
+    __slots__ = CLASS_LIST_COLUMNS + ("number",)
+    columns = CLASS_LIST_COLUMNS
+
+    def __init__(self, row):
+        for name, value in zip(self.columns, row):
+            setattr(self, name, value)
+        self.number = self.courseNumber
+        # Decode once here so cached rows are never mutated by the DTO validator
+        if isinstance(self.days, str):
+            self.days = json.loads(self.days) if self.days else []
+
+
+class ClassIndexRow(ClassListRow):
+    __slots__ = ("delivery",)
+    columns = CLASS_INDEX_COLUMNS
+
+
 class ClassRepository(BaseRepository):
     def __init__(self):
         super().__init__(Class)
@@ -14,16 +47,31 @@ class ClassRepository(BaseRepository):
         return db.query(
             Class.semester,
             func.count(Class.id).label("class_count")
-        ).group_by(Class.semester).all()
+        ).filter(LIVE_CLASS).group_by(Class.semester).all()
 
     def get_departments_with_counts(self, db: Session, semester: str) -> List:
         return db.query(
             Class.subject,
             func.count(Class.id).label("class_count")
-        ).filter(Class.semester == semester).group_by(Class.subject).all()
+        ).filter(Class.semester == semester, LIVE_CLASS).group_by(Class.subject).all()
 
-    def find_classes(self, db: Session, subject: Optional[str], search: Optional[str], semester: Optional[str], limit: int, offset: int) -> List[Class]:
-        query = db.query(Class)
+    def find_class_rows(self, db: Session, subject: Optional[str], search: Optional[str], semester: Optional[str], limit: int, offset: int) -> List[ClassListRow]:
+        # Column-only query: rows come back as plain tuples, bypassing the identity map and attribute instrumentation
+        columns = [getattr(Class, name) for name in CLASS_LIST_COLUMNS]
+        query = self._apply_filters(db.query(*columns), subject, search, semester)
+        query = query.order_by(Class.courseNumber, Class.subject)
+        return [ClassListRow(row) for row in query.offset(offset).limit(limit)]
+
+    def get_class_index_rows(self, db: Session, semester: str) -> List[ClassIndexRow]:
+        columns = [getattr(Class, name) for name in CLASS_INDEX_COLUMNS]
+        query = db.query(*columns).filter(Class.semester == semester, LIVE_CLASS).order_by(Class.courseNumber, Class.subject, Class.id)
+        return [ClassIndexRow(row) for row in query]
+
+    def get_class_descriptions(self, db: Session, semester: str) -> Dict[str, Optional[str]]:
+        return dict(db.query(Class.id, Class.description).filter(Class.semester == semester, LIVE_CLASS))
+
+    def _apply_filters(self, query, subject: Optional[str], search: Optional[str], semester: Optional[str]):
+        query = query.filter(LIVE_CLASS)
         if subject:
             query = query.filter(Class.subject.ilike(f"%{subject}%"))
         if search:
@@ -36,9 +84,20 @@ class ClassRepository(BaseRepository):
                 query = query.filter(or_(Class.title.ilike(f"%{search}%"), Class.subject.ilike(f"%{search}%"), Class.courseNumber.ilike(f"%{search}%")))
         if semester:
             query = query.filter(Class.semester == semester)
-
-        query = query.order_by(Class.courseNumber, Class.subject).options(joinedload(Class.meetingTimes))
-        return query.offset(offset).limit(limit).all()
+        return query
 
     def get_prerequisites_for_class(self, db: Session, class_id: str) -> List[Prerequisite]:
         return db.query(Prerequisite).filter(Prerequisite.class_id == class_id).all()
+
+    def get_course_keys(self, db: Session, semester: str) -> List:
+        return db.query(Class.subject, Class.courseNumber).filter(Class.semester == semester, LIVE_CLASS).distinct().all()
+
+    def get_course_prerequisite_rows(self, db: Session, semester: str) -> List:
+        return db.query(
+            Class.subject,
+            Class.courseNumber,
+            Prerequisite.prerequisite_subject,
+            Prerequisite.prerequisite_number,
+            Prerequisite.prerequisite_type,
+            Prerequisite.prerequisite_group
+        ).join(Class, Prerequisite.class_id == Class.id).filter(Class.semester == semester, LIVE_CLASS).distinct().all()
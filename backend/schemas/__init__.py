@@ -4,11 +4,22 @@ from .class_schemas import (
     ClassDetail,
     ClassScheduleItem,
     ClassListResponse,
+    FacetValueResponse,
+    AutocompleteSuggestion,
+    AutocompleteResponse,
     DepartmentResponse,
     DepartmentListResponse,
 )
 from .professor_schemas import ProfessorResponse, ProfessorSearchRequest
 from .user_schemas import UserResponse, UserCreate
+from .prerequisite_schemas import (
+    CourseRef,
+    PrerequisiteGroupResponse,
+    PrerequisiteChainResponse,
+    UnlockedCoursesResponse,
+    PrerequisiteCyclesResponse,
+)
+from .planner_schemas import PlanRequest, PlannedCourse, PlannedTerm, PlanResponse
 from .schedule_schemas import (
     ScheduleUpdate,
     ScheduleResponse,
@@ -25,6 +36,9 @@ __all__ = [
     "ClassDetail",
     "ClassScheduleItem",
     "ClassListResponse",
+    "FacetValueResponse",
+    "AutocompleteSuggestion",
+    "AutocompleteResponse",
     "DepartmentResponse",
     "DepartmentListResponse",
     # Professors
@@ -33,6 +47,17 @@ __all__ = [
     # Users
     "UserResponse",
     "UserCreate",
+    # Prerequisites
+    "CourseRef",
+    "PrerequisiteGroupResponse",
+    "PrerequisiteChainResponse",
+    "UnlockedCoursesResponse",
+    "PrerequisiteCyclesResponse",
+    # Planner
+    "PlanRequest",
+    "PlannedCourse",
+    "PlannedTerm",
+    "PlanResponse",
     # Schedules
     "ScheduleUpdate",
     "ScheduleResponse",
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, ConfigDict, model_validator
 import json
 
@@ -48,11 +48,34 @@ class ClassDetail(BaseClassDTO):
     sections: List[dict] = []
 
 
+class FacetValueResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    value: str
+    count: int
+
+
 class ClassListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     classes: List[BaseClassDTO]
     pagination: PaginationResponse
+    facets: Optional[Dict[str, List[FacetValueResponse]]] = None
+
+
+class AutocompleteSuggestion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    type: str
+    value: str
+    label: Optional[str] = None
+    count: int
+
+
+class AutocompleteResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    suggestions: List[AutocompleteSuggestion]
 
 
 class DepartmentResponse(BaseModel):
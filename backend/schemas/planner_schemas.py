@@ -0,0 +1,34 @@
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+
+from .prerequisite_schemas import CourseRef
+
+
+class PlanRequest(BaseModel):
+    targets: List[str]
+    completed: List[str] = []
+    max_credits_per_term: int = 15
+    start_semester: Optional[str] = None
+    include_summers: bool = False
+    catalog_semester: Optional[str] = None
+
+
+class PlannedCourse(CourseRef):
+    credits: int
+
+
+class PlannedTerm(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    semester: str
+    name: str
+    credits: int
+    courses: List[PlannedCourse]
+
+
+class PlanResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    terms: List[PlannedTerm]
+    unscheduled: List[CourseRef]
+    total_credits: int
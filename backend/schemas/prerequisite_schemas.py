@@ -0,0 +1,39 @@
+from typing import List
+from pydantic import BaseModel, ConfigDict
+
+
+class CourseRef(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    subject: str
+    number: str
+
+
+class PrerequisiteGroupResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    group: int
+    type: str
+    courses: List[CourseRef]
+
+
+class PrerequisiteChainResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    course: CourseRef
+    direct: List[PrerequisiteGroupResponse]
+    chain: List[CourseRef]
+
+
+class UnlockedCoursesResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    course: CourseRef
+    direct: List[CourseRef]
+    all: List[CourseRef]
+
+
+class PrerequisiteCyclesResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    cycles: List[List[CourseRef]]
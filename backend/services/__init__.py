@@ -2,5 +2,7 @@ from .professor_service import ProfessorService
 from .class_service import ClassService
 from .user_service import UserService
 from .schedule_service import ScheduleService
+from .prerequisite_service import PrerequisiteService
+from .planner_service import PlannerService
 
-__all__ = ["ProfessorService", "ClassService", "UserService", "ScheduleService"]
\ No newline at end of file
+__all__ = ["ProfessorService", "ClassService", "UserService", "ScheduleService", "PrerequisiteService", "PlannerService"]
\ No newline at end of file
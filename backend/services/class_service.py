@@ -2,12 +2,20 @@ from typing import List, Dict, Optional, Any
 from sqlalchemy.orm import Session
 
 from backend.repositories import ClassRepository
+from backend.indexes import SemesterIndexRegistry, SemesterSnapshot, FacetIndex, PrefixIndex, TextIndex, EligibilityIndex, to_bitmap, match_course_code
+from backend.services.prerequisite_service import PrerequisiteService
 from backend.config import settings
+from backend.core.exceptions import ValidationException
 from database.models import Class as ClassModel
 
+# Facet index plus the position-based indexes derived from it, rebuilt together
+_semester_snapshots = SemesterIndexRegistry(settings.catalog_index_ttl_seconds)
+_prefix_indexes = SemesterIndexRegistry(settings.catalog_index_ttl_seconds)
+
 class ClassService:
-    def __init__(self, class_repo: ClassRepository):
+    def __init__(self, class_repo: ClassRepository, prerequisite_service: PrerequisiteService):
         self.class_repo = class_repo
+        self.prerequisite_service = prerequisite_service
 
     def get_classes(
         self,
@@ -16,10 +24,20 @@ class ClassService:
         search: Optional[str] = None,
         semester: Optional[str] = None,
         limit: int = 500,
-        page: int = 1
+        page: int = 1,
+        filters: Optional[Dict[str, List[Any]]] = None,
+        include_facets: bool = False,
+        completed: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         offset = (page - 1) * limit
-        classes = self.class_repo.find_classes(db, subject, search, semester, limit + 1, offset)
+        free_text_search = bool(search and search.strip()) and not match_course_code(search)
+        if include_facets or free_text_search or completed is not None or (filters and any(filters.values())):
+            # The indexes hold one semester each; searching every semester is only possible on the SQL path
+            if not semester:
+                raise ValidationException("semester is required for free-text search, filters, facets and completed courses")
+            return self._get_classes_from_index(db, subject, search, semester, limit, page, filters or {}, include_facets, completed)
+
+        classes = self.class_repo.find_class_rows(db, subject, search, semester, limit + 1, offset)
 
         has_next = len(classes) > limit
         if has_next:
@@ -37,6 +55,99 @@ class ClassService:
             }
         }
 
+    def _get_classes_from_index(
+        self,
+        db: Session,
+        subject: Optional[str],
+        search: Optional[str],
+        semester: str,
+        limit: int,
+        page: int,
+        filters: Dict[str, List[Any]],
+        include_facets: bool,
+        completed: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        # One snapshot per request, so every mask below indexes the same rows
+        snapshot = self.get_snapshot(db, semester)
+        index = snapshot.facets
+
+        base_mask = index.all_mask
+        ranked = None
+        if subject:
+            base_mask &= index.subject_mask(subject)
+        if search and search.strip():
+            course_code = match_course_code(search)
+            if course_code:
+                base_mask &= index.course_code_mask(*course_code)
+            else:
+                ranked = self._text_index(db, semester, snapshot).search(search)
+                base_mask &= to_bitmap(ranked, index.size)
+        if completed is not None:
+            courses = [self.parse_course_code(code) for code in completed]
+            base_mask &= self._eligibility_index(db, semester, snapshot).eligible_mask(courses)
+
+        dimension_masks = index.dimension_masks(filters)
+        mask = index.combine(base_mask, dimension_masks)
+        total = mask.bit_count()
+
+        offset = (page - 1) * limit
+        if ranked is None:
+            classes = index.page(mask, limit, offset)
+        else:
+            # Keep relevance order rather than catalog order
+            classes = [index.rows[pos] for pos in ranked if mask >> pos & 1][offset:offset + limit]
+
+        return {
+            "classes": classes,
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "totalPages": (total + limit - 1) // limit,
+                "hasNext": page * limit < total,
+                "hasPrev": page > 1
+            },
+            "facets": index.count_facets(base_mask, dimension_masks, settings.max_facet_values) if include_facets else None
+        }
+
+    def get_snapshot(self, db: Session, semester: str) -> SemesterSnapshot:
+        return _semester_snapshots.get(
+            semester, lambda: SemesterSnapshot(FacetIndex(self.class_repo.get_class_index_rows(db, semester)))
+        )
+
+    def get_facet_index(self, db: Session, semester: str) -> FacetIndex:
+        return self.get_snapshot(db, semester).facets
+
+    def _text_index(self, db: Session, semester: str, snapshot: SemesterSnapshot) -> TextIndex:
+        return snapshot.derived(
+            "text",
+            lambda facets: TextIndex(
+                facets.rows,
+                self.class_repo.get_class_descriptions(db, semester),
+                settings.search_cache_size
+            )
+        )
+
+    def _eligibility_index(self, db: Session, semester: str, snapshot: SemesterSnapshot) -> EligibilityIndex:
+        return snapshot.derived(
+            "eligibility",
+            lambda facets: EligibilityIndex(self.prerequisite_service.get_graph(db, semester), facets.rows)
+        )
+
+    def parse_course_code(self, code: str):
+        course_code = match_course_code(code)
+        if not course_code:
+            raise ValidationException(f"Invalid course code '{code}', expected e.g. 'ECE 2214'")
+        return course_code
+
+    def get_autocomplete_suggestions(self, db: Session, query: str, semester: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        semester = semester or settings.default_semester
+        index = _prefix_indexes.get(
+            semester,
+            lambda: PrefixIndex(self.get_facet_index(db, semester).rows, settings.max_autocomplete_results)
+        )
+        return index.suggest(query, limit)
+
     def get_class_by_id(self, db: Session, class_id: str) -> Optional[ClassModel]:
         cls = self.class_repo.get_by_id(db, class_id)
         if cls:
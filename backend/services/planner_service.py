@@ -0,0 +1,150 @@
+from typing import List, Dict, Optional, Any, Set, Tuple
+from sqlalchemy.orm import Session
+
+from backend.services.class_service import ClassService
+from backend.services.prerequisite_service import PrerequisiteService
+from backend.indexes import PrerequisiteGraph
+from backend.config import settings
+from backend.core.exceptions import NotFoundException, ValidationException
+
+CourseKey = Tuple[str, str]
+
+CONCURRENT_TYPES = frozenset({"concurrent", "corequisite"})
+
+def _next_semester(code: str) -> str:
+    # Semester codes are YYYYTT with TT in 10 (fall), 20 (spring), 30 (summer)
+    year, term = int(code[:4]), int(code[4:])
+    if term >= 30:
+        return f"{year + 1}10"
+    return f"{year}{term + 10}"
+
+class PlannerService:
+    def __init__(self, class_service: ClassService, prerequisite_service: PrerequisiteService):
+        self.class_service = class_service
+        self.prerequisite_service = prerequisite_service
+
+    def build_plan(
+        self,
+        db: Session,
+        targets: List[str],
+        completed: List[str],
+        max_credits_per_term: int,
+        start_semester: Optional[str] = None,
+        include_summers: bool = False,
+        catalog_semester: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if max_credits_per_term < 1:
+            raise ValidationException("max_credits_per_term must be at least 1")
+        catalog_semester = catalog_semester or settings.default_semester
+        graph = self.prerequisite_service.get_graph(db, catalog_semester)
+        credits = self._course_credits(db, catalog_semester)
+
+        target_keys = [self.class_service.parse_course_code(code) for code in targets]
+        for course in target_keys:
+            if course not in graph.courses:
+                raise NotFoundException(f"Course '{course[0]} {course[1]}' not found")
+        done = {self.class_service.parse_course_code(code) for code in completed}
+
+        needed = self._resolve_requirements(graph, target_keys, done)
+        clauses = {course: self._scheduling_clauses(graph, course) for course in needed}
+        depths = graph.dependent_depths
+        priority = sorted(needed, key=lambda c: (-depths.get(c, 0), c))
+
+        terms = []
+        remaining = set(needed)
+        semester = start_semester or _next_semester(settings.default_semester)
+        while remaining and len(terms) < settings.max_plan_terms:
+            if semester.endswith("30") and not include_summers:
+                semester = _next_semester(semester)
+                continue
+
+            scheduled: List[CourseKey] = []
+            term_credits = 0
+            progress = True
+            # Re-scan after each pick so corequisites placed this term can unlock their partners
+            while progress:
+                progress = False
+                for course in priority:
+                    if course not in remaining:
+                        continue
+                    course_credits = credits.get(course, 3)
+                    if scheduled and term_credits + course_credits > max_credits_per_term:
+                        continue
+                    if self._is_ready(clauses[course], done, scheduled):
+                        scheduled.append(course)
+                        remaining.discard(course)
+                        term_credits += course_credits
+                        progress = True
+
+            if not scheduled:
+                break
+            done.update(scheduled)
+            terms.append({
+                "semester": semester,
+                "name": settings.semester_names.get(semester, semester),
+                "credits": term_credits,
+                "courses": [
+                    {"subject": c[0], "number": c[1], "credits": credits.get(c, 3)}
+                    for c in sorted(scheduled, key=lambda c: (-depths.get(c, 0), c))
+                ]
+            })
+            semester = _next_semester(semester)
+
+        return {
+            "terms": terms,
+            "unscheduled": [{"subject": c[0], "number": c[1]} for c in sorted(remaining)],
+            "total_credits": sum(term["credits"] for term in terms)
+        }
+
+    def _resolve_requirements(self, graph: PrerequisiteGraph, targets: List[CourseKey], completed: Set[CourseKey]) -> Set[CourseKey]:
+        needed: Set[CourseKey] = set()
+        completed_mask = 0
+        for course in completed:
+            if course in graph.course_ids:
+                completed_mask |= 1 << graph.course_ids[course]
+        stack = list(reversed(targets))
+        # 'or' groups are settled only after all hard requirements are known, so they can reuse them
+        deferred: List[List[CourseKey]] = []
+        while stack or deferred:
+            if not stack:
+                options = deferred.pop(0)
+                if not any(c in completed or c in needed for c in options):
+                    # Pick the alternative that drags in the fewest courses not yet taken
+                    stack.append(min(options, key=lambda c: ((graph.chain_mask(c) & ~completed_mask).bit_count(), c)))
+                continue
+
+            course = stack.pop()
+            if course in completed or course in needed:
+                continue
+            needed.add(course)
+            for group in graph.direct_prerequisites(course):
+                options = [c for c in group["courses"] if c != course]
+                if not options:
+                    continue
+                if group["type"] == "or":
+                    deferred.append(options)
+                else:
+                    stack.extend(options)
+        return needed
+
+    def _scheduling_clauses(self, graph: PrerequisiteGraph, course: CourseKey) -> List[Tuple[List[CourseKey], bool, bool]]:
+        clauses = []
+        for group in graph.direct_prerequisites(course):
+            options = [c for c in group["courses"] if c != course]
+            if options:
+                clauses.append((options, group["type"] == "or", group["type"] in CONCURRENT_TYPES))
+        return clauses
+
+    def _is_ready(self, clauses, done: Set[CourseKey], scheduled: List[CourseKey]) -> bool:
+        for options, any_of, concurrent in clauses:
+            satisfied = [c in done or (concurrent and c in scheduled) for c in options]
+            if not (any(satisfied) if any_of else all(satisfied)):
+                return False
+        return True
+
+    def _course_credits(self, db: Session, semester: str) -> Dict[CourseKey, int]:
+        credits = {}
+        for row in self.class_service.get_facet_index(db, semester).rows:
+            if row.credits:
+                credits[(row.subject, row.courseNumber)] = max(row.credits, credits.get((row.subject, row.courseNumber), 0))
+        return credits
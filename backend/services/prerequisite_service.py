@@ -0,0 +1,64 @@
+from typing import List, Dict, Optional, Any
+from sqlalchemy.orm import Session
+import logging
+
+from backend.repositories import ClassRepository
+from backend.indexes import SemesterIndexRegistry, PrerequisiteGraph
+from backend.config import settings
+from backend.core.exceptions import NotFoundException
+
+_prerequisite_graphs = SemesterIndexRegistry(settings.catalog_index_ttl_seconds)
+
+def _course_ref(course) -> Dict[str, str]:
+    return {"subject": course[0], "number": course[1]}
+
+class PrerequisiteService:
+    def __init__(self, class_repo: ClassRepository):
+        self.class_repo = class_repo
+
+    def get_graph(self, db: Session, semester: Optional[str] = None) -> PrerequisiteGraph:
+        semester = semester or settings.default_semester
+        return _prerequisite_graphs.get(semester, lambda: self._build_graph(db, semester))
+
+    def _build_graph(self, db: Session, semester: str) -> PrerequisiteGraph:
+        graph = PrerequisiteGraph(
+            self.class_repo.get_course_keys(db, semester),
+            self.class_repo.get_course_prerequisite_rows(db, semester)
+        )
+        if graph.cycles:
+            logging.getLogger(__name__).warning(
+                f"Prerequisite graph for {semester} has {len(graph.cycles)} cycle(s): "
+                + "; ".join(" -> ".join(f"{s} {n}" for s, n in cycle) for cycle in graph.cycles[:10])
+            )
+        return graph
+
+    def get_prerequisite_chain(self, db: Session, subject: str, number: str, semester: Optional[str] = None) -> Dict[str, Any]:
+        graph = self.get_graph(db, semester)
+        course = self._resolve_course(graph, subject, number)
+        return {
+            "course": _course_ref(course),
+            "direct": [
+                {"group": group["group"], "type": group["type"], "courses": [_course_ref(c) for c in group["courses"]]}
+                for group in graph.direct_prerequisites(course)
+            ],
+            "chain": [_course_ref(c) for c in graph.chain(course)]
+        }
+
+    def get_unlocked_courses(self, db: Session, subject: str, number: str, semester: Optional[str] = None) -> Dict[str, Any]:
+        graph = self.get_graph(db, semester)
+        course = self._resolve_course(graph, subject, number)
+        return {
+            "course": _course_ref(course),
+            "direct": [_course_ref(c) for c in graph.direct_unlocks(course)],
+            "all": [_course_ref(c) for c in graph.unlocks(course)]
+        }
+
+    def get_cycles(self, db: Session, semester: Optional[str] = None) -> List[List[Dict[str, str]]]:
+        graph = self.get_graph(db, semester)
+        return [[_course_ref(c) for c in cycle] for cycle in graph.cycles]
+
+    def _resolve_course(self, graph: PrerequisiteGraph, subject: str, number: str):
+        course = (subject.upper().strip(), number.upper().strip())
+        if course not in graph.courses:
+            raise NotFoundException(f"Course '{course[0]} {course[1]}' not found")
+        return course
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text, Index
+from sqlalchemy import create_engine, inspect, text, Column, String, Integer, Float, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -32,6 +32,8 @@ class Class(Base):
     time = Column(Text)  # Formatted meeting time
     location = Column(Text)  # Primary location
     days = Column(Text)  # Days as JSON array
+    contentHash = Column(String)  # Hash of the scraped fields, used to skip unchanged rows on reload
+    archivedAt = Column(DateTime)  # Set when the section drops out of the listing; NULL while live
 
     meetingTimes = relationship("MeetingTime", back_populates="class_", cascade="all, delete-orphan")
 
@@ -183,6 +185,16 @@ class Rating(Base):
     
     professor = relationship("Professor", back_populates="ratings")
 
+class ProfessorCrawlState(Base):
+    __tablename__ = 'professor_crawl_state'
+
+    professorId = Column(String, ForeignKey('professors.id', ondelete='CASCADE'), primary_key=True)
+    numRatings = Column(Integer, default=0)  # numRatings seen when ratings were last crawled
+    lastRatingId = Column(String)  # Newest rating stored; paging stops when it is reached
+    lastRatingCursor = Column(String)  # Connection cursor of that rating
+    lastRatingDate = Column(DateTime)
+    crawledAt = Column(DateTime, default=datetime.utcnow)
+
 
 
 
@@ -222,6 +234,22 @@ def create_engine_and_session():
 
     return engine, SessionLocal
 
+# Columns added after tables were first created; create_all() won't add them to existing tables
+ADDED_COLUMNS = {
+    'classes': {'contentHash': 'VARCHAR', 'archivedAt': 'TIMESTAMP'},
+}
+
+def ensure_schema(engine):
+    """Create missing tables and add any ADDED_COLUMNS the existing tables lack"""
+    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table_name, columns in ADDED_COLUMNS.items():
+            existing = {column['name'] for column in inspector.get_columns(table_name)}
+            for column_name, column_type in columns.items():
+                if column_name not in existing:
+                    connection.execute(text(f'ALTER TABLE {table_name} ADD COLUMN "{column_name}" {column_type}'))
+
 # Create a global session factory
 engine, SessionLocal = create_engine_and_session()
 
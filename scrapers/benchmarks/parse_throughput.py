@@ -0,0 +1,92 @@
+"""
+Rows/second for ClassDataProcessor parsing, serial and across process-pool sizes.
+
+    python -m scrapers.benchmarks.parse_throughput --rows 50000
+    python -m scrapers.benchmarks.parse_throughput --cassette-dir scrapers/cassettes
+
+Synthetic rows follow the ClassNav aaData layout; --cassette-dir uses recorded ClassNav pages instead.
+"""
+import base64
+import glob
+import gzip
+import json
+import os
+import random
+import time
+from typing import Any, List
+
+from scrapers.processors.classes_processor import ClassDataProcessor, create_parse_pool
+
+SUBJECTS = ('ECE', 'MATH', 'PHYS', 'CS', 'ENGL', 'HIST', 'CHEM', 'BIOL')
+DESCRIPTIONS = (
+    'Introduction to the field. Prerequisite: {subject} 1113 or MATH 1823.',
+    'Advanced topics. Prerequisites: {subject} 2214 and {subject} 2723; concurrent enrollment in MATH 2924.',
+    'Laboratory practice with instrumentation and report writing.',
+)
+
+
+def synthetic_rows(count: int, seed: int = 0) -> List[List[Any]]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        subject = rng.choice(SUBJECTS)
+        number = f"{rng.randint(1, 4)}{rng.randint(0, 9)}{rng.randint(0, 9)}{rng.randint(1, 5)}"
+        seats = rng.randint(0, 120)
+        rows.append([
+            '', str(10000 + i), subject, number, f"{rng.randint(1, 30):03d}", f"{subject} Course {i}",
+            'Doe, Jane', 'Lecture', 'Traditional In-Person', '', 'Full Term', 'Aug 25 - Dec 12',
+            f"<span data-failsafe='{rng.randint(0, seats)} out of {seats}' class='loading'> </span>",
+            'Aug 25 , Dec 12 , 10:00 am , 10:50 am , Felgar Hall , 300 , MWF , CLAS',
+            rng.choice(DESCRIPTIONS).format(subject=subject), 'Doe, Jane', '', 'Final exam', 'Not repeatable',
+        ])
+    return rows
+
+
+def recorded_rows(directory: str) -> List[List[Any]]:
+    rows = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json.gz'))):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            body = json.loads(base64.b64decode(json.load(f)['response']['body']))
+        if isinstance(body, dict):
+            rows.extend(body.get('aaData') or [])
+    return rows
+
+
+def measure(label: str, parse, rows: List[List[Any]], baseline: float = None) -> float:
+    started = time.perf_counter()
+    parsed = parse(rows)
+    elapsed = time.perf_counter() - started
+    rate = len(rows) / elapsed
+    speedup = f"{rate / baseline:5.2f}x" if baseline else "  1.00x"
+    print(f"{label:>12}  {len(parsed):>8} rows  {elapsed:8.2f}s  {rate:>10.0f} rows/s  {speedup}")
+    return rate
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark class row parsing throughput.')
+    parser.add_argument('--rows', type=int, default=50000, help='Synthetic rows to parse')
+    parser.add_argument('--cassette-dir', default=None, help='Parse rows from recorded ClassNav pages instead')
+    parser.add_argument('--workers', default=None, help='Comma-separated pool sizes (default: powers of two up to the CPU count)')
+    args = parser.parse_args()
+
+    rows = recorded_rows(args.cassette_dir) if args.cassette_dir else synthetic_rows(args.rows)
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        pool_sizes = [int(w) for w in args.workers.split(',')]
+    else:
+        pool_sizes = sorted({2 ** p for p in range(1, cpus.bit_length()) if 2 ** p <= cpus} | {cpus} - {1})
+
+    processor = ClassDataProcessor()
+    print(f"Parsing {len(rows)} rows on {cpus} CPUs")
+    baseline = measure('serial', processor.process_classes_batch, rows)
+    for workers in pool_sizes:
+        # Pool start-up is excluded: the loader keeps one pool for the whole run
+        with create_parse_pool(workers) as pool:
+            processor.process_classes_parallel(rows[:workers * 250], executor=pool)
+            measure(f"{workers} workers", lambda r: processor.process_classes_parallel(r, executor=pool), rows, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+from scrapers.clients.http_executor import RequestFailedError
+from scrapers.config.api_config import APIConfig
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+
+class CassetteMissError(RequestFailedError):
+    """Raised in replay mode when no recording exists for a request."""
+    pass
+
+
+def cassette_key(method: str, url: str, body: Optional[bytes]) -> str:
+    """Key a request by method, path, sorted query and body. Host is ignored so recordings
+    replay against any base URL, including the local replay server."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    digest = hashlib.sha256()
+    for piece in (method.upper().encode(), parts.path.encode(), query.encode(), body or b''):
+        digest.update(piece)
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class Cassette:
+    """Gzip-compressed on-disk HTTP recordings, one file per distinct request."""
+
+    def __init__(self, directory: str, mode: str):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}', expected '{RECORD}' or '{REPLAY}'")
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.stats = {'recorded': 0, 'replayed': 0, 'missed': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def load_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with gzip.open(self.path_for(key), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def replay(self, prepared: requests.PreparedRequest) -> requests.Response:
+        key = cassette_key(prepared.method, prepared.url, _body_bytes(prepared.body))
+        entry = self.load_entry(key)
+        if entry is None:
+            self._count('missed')
+            raise CassetteMissError(f"No recording for {prepared.method} {prepared.url} in {self.directory}")
+        self._count('replayed')
+        return _build_response(entry['response'], prepared)
+
+    def record(self, response: requests.Response):
+        prepared = response.request
+        body = _body_bytes(prepared.body)
+        key = cassette_key(prepared.method, prepared.url, body)
+        entry = {
+            'request': {
+                'method': prepared.method,
+                'url': prepared.url,
+                'body': base64.b64encode(body).decode('ascii') if body else None,
+            },
+            'response': {
+                'status': response.status_code,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() == 'content-type'},
+                'body': base64.b64encode(response.content).decode('ascii'),
+            },
+        }
+        # Write then rename so a concurrent reader or an interrupted run never sees a partial file
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._count('recorded')
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+def _body_bytes(body: Any) -> Optional[bytes]:
+    if body is None or isinstance(body, bytes):
+        return body
+    return body.encode('utf-8')
+
+
+def _build_response(recorded: Dict[str, Any], prepared: requests.PreparedRequest) -> requests.Response:
+    response = requests.Response()
+    response.status_code = recorded['status']
+    response.headers.update(recorded.get('headers') or {})
+    response._content = base64.b64decode(recorded['body'])
+    response._content_consumed = True  # iter_content() then serves the recorded body
+    response.encoding = 'utf-8'
+    response.url = prepared.url
+    response.request = prepared
+    return response
+
+
+def cassette_from_env() -> Optional[Cassette]:
+    """Cassette configured by HTTP_CASSETTE_MODE / HTTP_CASSETTE_DIR, or None when disabled."""
+    mode = APIConfig.get_cassette_mode()
+    if not mode:
+        return None
+    return Cassette(APIConfig.get_cassette_dir(), mode)
@@ -1,67 +1,227 @@
-import requests
 import json
-import time
 import logging
 import os
-from typing import Dict, List, Optional, Any
+import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Any
 from dotenv import load_dotenv
 from scrapers.config.api_config import APIConfig, EndpointConfig
+from scrapers.clients.http_executor import RequestExecutor, RequestFailedError
+from scrapers.clients.json_stream import ArrayStream
+from scrapers.clients.cassette import cassette_from_env
+from scrapers.clients.http_cache import http_cache_from_env
 
 load_dotenv()
 
+# Bytes read per network chunk, and rows handed downstream per chunk, when streaming pages
+STREAM_CHUNK_BYTES = 64 * 1024
+STREAM_ROWS_PER_CHUNK = 1000
+
 class ClassNavAPIClient:
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
         self.base_url = EndpointConfig.CLASSNAV_API
         self.headers = APIConfig.get_form_headers()
         self.logger = logging.getLogger(__name__)
+        self.max_concurrency = max(1, max_concurrency or APIConfig.get_max_concurrency())
+
+        # Keep-alive pool sized for the concurrent fetch mode; unchanged pages are revalidated with 304s
+        self.executor = RequestExecutor(headers=self.headers, pool_size=self.max_concurrency, timeout=timeout,
+                                        cassette=cassette_from_env(), http_cache=http_cache_from_env())
+        # Rows the API reported for the last fetch that ran to completion; None if it reported no total
+        self.last_fetch_total: Optional[int] = None
+    
+    def fetch_classes(self, start_index: int = 0, length: int = 1000, semester: str = '202510') -> Dict[str, Any]:
+        """Fetch one page; raises RequestFailedError once retries are exhausted."""
+        # Get abstracted parameters
+        params = APIConfig.get_pagination_params(start_index, length)
+        params.update(APIConfig.get_search_params(semester))
+        
+        response = self.executor.get(self.base_url, params=params)
+        data = response.json()
+        
+        # Debug logging
+        self.logger.debug(f"Fetched {len(data.get('aaData', []))} classes from index {start_index}")
+        
+        return data
     
-    def fetch_classes(self, start_index: int = 0, length: int = 1000, semester: str = '202510') -> Optional[Dict[str, Any]]:
+    def iter_page_rows(self, start_index: int = 0, length: int = 1000, semester: str = '202510',
+                       meta: Optional[Dict[str, Any]] = None) -> Iterator[List[Any]]:
+        """
+        Decode one page's aaData rows straight off the response stream, so the body is never held
+        whole. The request itself is retried by the executor; a stream that breaks while decoding
+        raises RequestFailedError. Once the page ends, its other top-level members (e.g.
+        iTotalDisplayRecords) are copied into meta when given.
+        """
+        params = APIConfig.get_pagination_params(start_index, length)
+        params.update(APIConfig.get_search_params(semester))
+        
+        yielded = 0
         try:
-            # Get abstracted parameters
-            params = APIConfig.get_pagination_params(start_index, length)
-            params.update(APIConfig.get_search_params(semester))
-            
-            response = requests.get(self.base_url, params=params, headers=self.headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Debug logging
-            self.logger.debug(f"Fetched {len(data.get('aaData', []))} classes from index {start_index}")
-            
-            return data
+            with self.executor.get(self.base_url, params=params, stream=True) as response:
+                stream = ArrayStream(response.iter_content(STREAM_CHUNK_BYTES))
+                for row in stream:
+                    yielded += 1
+                    yield row
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError, ValueError) as e:
+            raise RequestFailedError(f"Page at {start_index} broke after {yielded} rows: {e}") from e
+        self.logger.debug(f"Streamed {yielded} classes from index {start_index}")
+        if meta is not None:
+            meta.update(stream.meta)
+    
+    def iter_streamed_pages(self, semester: str = '202510', batch_size: int = 10000,
+                            rows_per_chunk: int = STREAM_ROWS_PER_CHUNK) -> Iterator[List[List[Any]]]:
+        """
+        Like iter_class_pages, but requests large pages one at a time and yields them in chunks of
+        rows_per_chunk as they decode, trading concurrency for far fewer round trips. Paging continues
+        until the reported iTotalDisplayRecords have arrived; a page that brings none before then raises.
+        """
+        self.logger.info(f"Streaming all classes for semester {semester} in pages of {batch_size}")
+        self.last_fetch_total = None
+        start_index, fetched = 0, 0
+        total_records = None
+        while True:
+            page_rows = 0
+            page_meta = {}
+            chunk = []
+            for row in self.iter_page_rows(start_index, batch_size, semester, page_meta):
+                chunk.append(row)
+                page_rows += 1
+                if len(chunk) >= rows_per_chunk:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+            fetched += page_rows
+            self.logger.info(f"Streamed {page_rows} classes from index {start_index} (Total: {fetched})")
             
-        except Exception as e:
-            self.logger.error(f"Error fetching classes: {e}")
-            return None
+            total_records = self._total_records(page_meta)
+            if total_records is None:
+                # Without a reported total, a short page is the end of the data
+                if page_rows < batch_size:
+                    break
+            elif fetched >= total_records:
+                break
+            elif not page_rows:
+                raise RequestFailedError(f"Stream stopped at {fetched} of {total_records} classes for {semester}")
+            # The server may cap the page size, so carry on from the rows that actually arrived
+            start_index += page_rows
+        
+        if total_records is not None and fetched != total_records:
+            self.logger.warning(f"Fetched {fetched} classes but the API reported {total_records}")
+        
+        self.last_fetch_total = total_records
+        self.logger.info(f"Completed fetching all classes. Total: {fetched}")
+        self.logger.info(f"ClassNav throughput: {self.executor.throughput()}")
     
-    def fetch_all_classes(self, semester: str = '202510', batch_size: int = 1000) -> List[List[Any]]:
+    def fetch_all_classes(self, semester: str = '202510', batch_size: int = 1000, concurrency: Optional[int] = None) -> List[List[Any]]:
         all_classes = []
-        start_index = 0
+        for page in self.iter_class_pages(semester, batch_size, concurrency):
+            all_classes.extend(page)
+        return all_classes
+    
+    def iter_class_pages(self, semester: str = '202510', batch_size: int = 1000,
+                         concurrency: Optional[int] = None) -> Iterator[List[List[Any]]]:
+        """
+        Yield the semester's aaData rows page by page, in offset order. At most `concurrency` pages are
+        in flight or buffered at once, so callers can process pages while later ones download. Raises
+        RequestFailedError if fewer rows arrive than the API reported, so a partial semester never
+        looks complete.
+        """
+        concurrency = self.max_concurrency if concurrency is None else max(1, min(concurrency, self.max_concurrency))
         
         self.logger.info(f"Starting to fetch all classes for semester {semester}")
+        self.last_fetch_total = None
         
-        while True:
+        first_page = self.fetch_classes(0, batch_size, semester)
+        first_rows = first_page.get('aaData') or []
+        if not first_rows:
+            self.logger.info("No classes to fetch.")
+            return
+        
+        fetched = len(first_rows)
+        total_records = self._total_records(first_page)
+        yield first_rows
+        
+        # The server may cap the page size below batch_size, so later pages step by what actually arrived
+        page_size = len(first_rows)
+        if total_records is None:
+            # Without a reported total, a short first page means there is nothing left to fetch
+            remaining = self._iter_remaining_sequential(semester, page_size, page_size) if page_size >= batch_size else ()
+        elif fetched >= total_records:
+            remaining = ()
+        elif concurrency == 1:
+            remaining = self._iter_remaining_sequential(semester, page_size, page_size, total_records)
+        else:
+            remaining = self._iter_remaining_concurrent(semester, page_size, total_records, concurrency)
+        for page in remaining:
+            fetched += len(page)
+            yield page
+        
+        if total_records is not None and fetched < total_records:
+            raise RequestFailedError(f"Fetched {fetched} classes for {semester} but the API reported {total_records}")
+        if total_records is not None and fetched != total_records:
+            self.logger.warning(f"Fetched {fetched} classes but the API reported {total_records}")
+        
+        self.last_fetch_total = total_records
+        self.logger.info(f"Completed fetching all classes. Total: {fetched}")
+        self.logger.info(f"ClassNav throughput: {self.executor.throughput()}")
+    
+    def _total_records(self, page: Dict[str, Any]) -> Optional[int]:
+        # DataTables server-side responses report the filtered total alongside the first page
+        for key in ('iTotalDisplayRecords', 'iTotalRecords'):
+            try:
+                return int(page[key])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return None
+    
+    def _iter_remaining_sequential(self, semester: str, batch_size: int, start_index: int,
+                                   total_records: Optional[int] = None) -> Iterator[List[List[Any]]]:
+        while total_records is None or start_index < total_records:
             self.logger.info(f"Fetching classes starting from index {start_index}...")
             
+            # Failures raise instead of looking like the end of the data
             response = self.fetch_classes(start_index, batch_size, semester)
-            if not response or not response.get('aaData') or len(response['aaData']) == 0:
+            classes_batch = response.get('aaData') or []
+            if not classes_batch:
                 self.logger.info("No more classes to fetch.")
                 break
             
-            classes_batch = response['aaData']
-            all_classes.extend(classes_batch)
-            
-            self.logger.info(f"Fetched {len(classes_batch)} classes (Total: {len(all_classes)})")
+            self.logger.info(f"Fetched {len(classes_batch)} classes (Total: {start_index + len(classes_batch)})")
+            yield classes_batch
             
-            # Check if we got fewer results than requested (end of data)
-            if len(classes_batch) < batch_size:
+            # Without a reported total, fewer results than requested is the end of the data
+            if total_records is None and len(classes_batch) < batch_size:
                 break
             
-            start_index += batch_size
-            
-            # Add a small delay to be respectful to the server
-            time.sleep(0.5)
+            start_index += len(classes_batch)
+    
+    def _iter_remaining_concurrent(self, semester: str, batch_size: int, total_records: int, concurrency: int) -> Iterator[List[List[Any]]]:
+        remaining_offsets = range(batch_size, total_records, batch_size)
+        offsets = iter(remaining_offsets)
+        self.logger.info(f"Fetching {len(remaining_offsets)} more pages of {batch_size} with {concurrency} concurrent requests ({total_records} records)")
+        
+        def fetch(offset: int):
+            rows = self.fetch_classes(offset, batch_size, semester).get('aaData') or []
+            # Offsets are fixed up front, so a short page would leave a gap before the next one
+            expected = min(batch_size, total_records - offset)
+            if len(rows) < expected:
+                raise RequestFailedError(f"Page at {offset} returned {len(rows)} of {expected} classes")
+            return rows
         
-        self.logger.info(f"Completed fetching all classes. Total: {len(all_classes)}")
-        return all_classes 
\ No newline at end of file
+        # A sliding window of `concurrency` requests: pages come back in offset order and a failed page
+        # re-raises, so a partial semester never reaches the loader
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='classnav') as executor:
+            window = deque(executor.submit(fetch, offset) for offset in islice(offsets, concurrency))
+            try:
+                while window:
+                    page = window.popleft().result()
+                    next_offset = next(offsets, None)
+                    if next_offset is not None:
+                        window.append(executor.submit(fetch, next_offset))
+                    yield page
+            finally:
+                for future in window:
+                    future.cancel()
@@ -1,18 +1,441 @@
+import io
+import json
 import logging
-from typing import Dict, List, Optional, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable
+from sqlalchemy import (
+    Table, MetaData, Column, String, Integer, delete, update, exists, values, column, bindparam, select, func,
+)
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 
-from database.models import create_engine_and_session, Class, MeetingTime, Professor, Rating, Prerequisite
+from database.models import (
+    create_engine_and_session, ensure_schema, Class, MeetingTime, Professor, Rating, Prerequisite, ProfessorCrawlState,
+)
+
+# Rows per INSERT ... ON CONFLICT statement; each batch commits once
+BULK_BATCH_SIZE = 1000
+
+# Columns the scraper owns on an existing class; time/location/days are derived elsewhere
+CLASS_UPDATE_COLUMNS = (
+    'subject', 'courseNumber', 'section', 'title', 'description', 'instructor',
+    'allInstructors', 'type', 'delivery', 'genEd', 'term', 'semesterDates', 'examInfo',
+    'repeatability', 'credits', 'availableSeats', 'totalSeats', 'semester', 'contentHash', 'archivedAt',
+)
+
+# Columns refreshed when a professor already exists (names and department are kept as first seen)
+PROFESSOR_UPDATE_COLUMNS = (
+    'avgRating', 'numRatings', 'avgDifficulty', 'wouldTakeAgainPercent',
+    'ratingTotal', 'ratingR1', 'ratingR2', 'ratingR3', 'ratingR4', 'ratingR5',
+    'teacherTags', 'courseCodes',
+)
+
+# Session-local table holding the IDs seen in the latest fetch, for the stale-section anti-join
+_fetched_class_ids = Table(
+    'fetched_class_ids', MetaData(),
+    Column('id', String, primary_key=True),
+    prefixes=['TEMPORARY'],
+)
+
+# Columns written to the staging tables and copied from them into the live ones
+STAGED_CLASS_COLUMNS = ('id',) + CLASS_UPDATE_COLUMNS
+STAGED_MEETING_TIME_COLUMNS = ('classId', 'days', 'startTime', 'endTime', 'location', 'building', 'room')
+STAGED_PREREQUISITE_COLUMNS = (
+    'class_id', 'prerequisite_subject', 'prerequisite_number', 'prerequisite_type', 'prerequisite_group', 'raw_text',
+)
+
+# A full load smaller than this fraction of the live semester is refused rather than swapped in, and
+# on the direct path leaves stale sections unarchived
+MIN_STAGED_RATIO = 0.5
+
+class StagingValidationError(Exception):
+    """Raised when a staged semester fails its checks; the live tables are left untouched."""
+    pass
+
+def _staging_table(name: str, source: Table, columns: Iterable[str]) -> Table:
+    # No keys or indexes while loading; SemesterStage builds them once the rows are in
+    return Table(name, MetaData(), *(Column(c, source.c[c].type) for c in columns), prefixes=['TEMPORARY'])
+
+_staging_classes = _staging_table('staging_classes', Class.__table__, STAGED_CLASS_COLUMNS)
+_staging_meeting_times = _staging_table('staging_meeting_times', MeetingTime.__table__, STAGED_MEETING_TIME_COLUMNS)
+_staging_prerequisites = _staging_table('staging_prerequisites', Prerequisite.__table__, STAGED_PREREQUISITE_COLUMNS)
+_staged_changed_ids = Table(
+    'staged_changed_ids', MetaData(),
+    Column('id', String, primary_key=True),
+    prefixes=['TEMPORARY'],
+)
+
+def _copy_text(value: Any) -> str:
+    # COPY text format: \N is NULL; backslash, tab and line breaks are escaped
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def _chunked(rows: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def _class_row(class_data: Dict[str, Any], semester: str) -> Dict[str, Any]:
+    return {
+        'id': f"{class_data['id']}-{semester}",
+        'subject': class_data['subject'],
+        'courseNumber': class_data['courseNumber'],
+        'section': class_data['section'],
+        'title': class_data['title'],
+        'description': class_data.get('description'),
+        'instructor': class_data.get('instructor'),
+        'allInstructors': class_data.get('allInstructors'),
+        'type': class_data.get('type'),
+        'delivery': class_data.get('delivery'),
+        'genEd': class_data.get('genEd'),
+        'term': class_data.get('term'),
+        'semesterDates': class_data.get('semesterDates'),
+        'examInfo': class_data.get('examInfo'),
+        'repeatability': class_data.get('repeatability'),
+        'credits': class_data.get('credits', 3),
+        'availableSeats': class_data.get('availableSeats', 0),
+        'totalSeats': class_data.get('totalSeats', 0),
+        'semester': semester,
+        'contentHash': class_data.get('contentHash'),
+        # A section that is listed again comes back out of the archive
+        'archivedAt': None,
+    }
+
+def _archive_stale(semester: str, current: Table):
+    # Live sections of the semester whose ID is not in current (a table with an id column)
+    return (
+        update(Class)
+        .where(Class.semester == semester)
+        .where(Class.archivedAt.is_(None))
+        .where(~exists().where(current.c.id == Class.id))
+        .values(archivedAt=datetime.utcnow(), contentHash=None)
+        .execution_options(synchronize_session=False)
+    )
+
+def _prerequisite_rows(class_id: str, class_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {
+            'class_id': class_id,
+            'prerequisite_subject': prereq_data['prerequisite_subject'],
+            'prerequisite_number': prereq_data['prerequisite_number'],
+            'prerequisite_type': prereq_data.get('prerequisite_type', 'required'),
+            'prerequisite_group': prereq_data.get('prerequisite_group', 1),
+            'raw_text': prereq_data.get('raw_text', ''),
+        }
+        for prereq_data in class_data.get('prerequisites') or []
+    ]
+
+def _meeting_time_row(class_id: str, meeting_time_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'classId': class_id,
+        'days': meeting_time_data.get('days'),
+        'startTime': meeting_time_data.get('startTime'),
+        'endTime': meeting_time_data.get('endTime'),
+        'location': meeting_time_data.get('location'),
+        'building': meeting_time_data.get('building'),
+        'room': meeting_time_data.get('room'),
+    }
+
+def _professor_row(professor_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': professor_data['id'],
+        'firstName': professor_data['firstName'],
+        'lastName': professor_data['lastName'],
+        'department': professor_data.get('department'),
+        'avgRating': professor_data.get('avgRating'),
+        'numRatings': professor_data.get('numRatings', 0),
+        'avgDifficulty': professor_data.get('avgDifficulty'),
+        'wouldTakeAgainPercent': professor_data.get('wouldTakeAgainPercent'),
+        'ratingTotal': professor_data.get('ratingTotal', 0),
+        'ratingR1': professor_data.get('ratingR1', 0),
+        'ratingR2': professor_data.get('ratingR2', 0),
+        'ratingR3': professor_data.get('ratingR3', 0),
+        'ratingR4': professor_data.get('ratingR4', 0),
+        'ratingR5': professor_data.get('ratingR5', 0),
+        'teacherTags': professor_data.get('teacherTags'),
+        'courseCodes': professor_data.get('courseCodes'),
+    }
+
+def _as_json_text(value: Any) -> Any:
+    # The processor splits tag strings into lists; the column stores them as a JSON array
+    return json.dumps(value) if isinstance(value, (list, dict)) else value
+
+def _rating_row(rating_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': rating_data['id'],
+        'legacyId': rating_data.get('legacyId'),
+        'professorId': rating_data['professorId'],
+        'comment': rating_data.get('comment'),
+        'class': rating_data.get('class'),
+        'difficultyRating': rating_data.get('difficultyRating'),
+        'clarityRating': rating_data.get('clarityRating'),
+        'helpfulRating': rating_data.get('helpfulRating'),
+        'wouldTakeAgain': rating_data.get('wouldTakeAgain'),
+        'grade': rating_data.get('grade'),
+        'attendanceMandatory': rating_data.get('attendanceMandatory'),
+        'textbookUse': rating_data.get('textbookUse'),
+        'isForOnlineClass': rating_data.get('isForOnlineClass'),
+        'isForCredit': rating_data.get('isForCredit'),
+        'ratingTags': _as_json_text(rating_data.get('ratingTags')),
+        'flagStatus': rating_data.get('flagStatus'),
+        'createdByUser': rating_data.get('createdByUser'),
+        'thumbsUpTotal': rating_data.get('thumbsUpTotal', 0),
+        'thumbsDownTotal': rating_data.get('thumbsDownTotal', 0),
+    }
+
+class SemesterStage:
+    """
+    One semester's full load, staged in temporary tables on a dedicated connection. Rows go in with
+    COPY on PostgreSQL (executemany elsewhere) and the live tables are not touched until swap(),
+    which validates the staged counts and applies the semester in one short transaction. Readers
+    see either the old catalog or the new one.
+    """
+
+    def __init__(self, db_client: 'SQLAlchemyDatabaseClient', semester: str):
+        self.db_client = db_client
+        self.semester = semester
+        self.logger = db_client.logger
+        self.is_postgres = db_client.engine.dialect.name == 'postgresql'
+        self.sent = {'classes': 0, 'meeting_times': 0, 'prerequisites': 0, 'duplicates': 0}
+        self._seen_ids = set()
+        self.connection = db_client.engine.connect()
+        with self.connection.begin():
+            for table in (_staging_classes, _staging_meeting_times, _staging_prerequisites, _staged_changed_ids):
+                table.drop(self.connection, checkfirst=True)
+                table.create(self.connection)
+
+    def __enter__(self) -> 'SemesterStage':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # Temporary tables outlive a pooled connection's checkout, so drop them explicitly
+        try:
+            self.connection.rollback()
+            with self.connection.begin():
+                for table in (_staging_classes, _staging_meeting_times, _staging_prerequisites, _staged_changed_ids):
+                    table.drop(self.connection, checkfirst=True)
+        except Exception as e:
+            self.logger.warning(f"Could not drop staging tables for {self.semester}: {e}")
+        finally:
+            self.connection.close()
+
+    def add(self, classes: List[Dict[str, Any]], meeting_times_by_class: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Stage parsed classes with their prerequisites and meeting times (keyed by raw class ID). Returns classes staged."""
+        class_rows, meeting_time_rows, prerequisite_rows = [], [], []
+        for class_data in classes:
+            row = _class_row(class_data, self.semester)
+            if row['id'] in self._seen_ids:
+                # Pages that shift mid-crawl can repeat a section; the first copy wins
+                self.sent['duplicates'] += 1
+                continue
+            self._seen_ids.add(row['id'])
+            class_rows.append(row)
+            prerequisite_rows.extend(_prerequisite_rows(row['id'], class_data))
+            meeting_time_rows.extend(
+                _meeting_time_row(row['id'], meeting_time)
+                for meeting_time in meeting_times_by_class.get(class_data['id'], [])
+            )
+
+        with self.connection.begin():
+            self._copy(_staging_classes, class_rows)
+            self._copy(_staging_meeting_times, meeting_time_rows)
+            self._copy(_staging_prerequisites, prerequisite_rows)
+        self.sent['classes'] += len(class_rows)
+        self.sent['meeting_times'] += len(meeting_time_rows)
+        self.sent['prerequisites'] += len(prerequisite_rows)
+        return len(class_rows)
+
+    def _copy(self, table: Table, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        if not self.is_postgres:
+            self.connection.execute(table.insert(), rows)
+            return
+        columns = table.c.keys()
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(_copy_text(row[name]) for name in columns))
+            buffer.write('\n')
+        buffer.seek(0)
+        cursor = self.connection.connection.cursor()
+        try:
+            quoted = ', '.join(f'"{name}"' for name in columns)
+            cursor.copy_expert(f'COPY {table.name} ({quoted}) FROM STDIN', buffer)
+        finally:
+            cursor.close()
+
+    def swap(self, min_ratio: float = MIN_STAGED_RATIO) -> Dict[str, Any]:
+        """
+        Index and validate the staged rows, then in one transaction upsert the sections whose content
+        hash changed, replace their meeting times and prerequisites, and archive sections no longer
+        listed. Raises StagingValidationError, changing nothing, if a check fails.
+        Returns {'staged': n, 'changed': [raw class IDs], 'archived': n}.
+        """
+        with self.connection.begin():
+            self._build_indexes()
+            staged = self._validate(min_ratio)
+
+        classes = Class.__table__
+        changed = select(_staged_changed_ids.c.id)
+        with self.connection.begin():
+            self.connection.execute(_staged_changed_ids.insert().from_select(
+                ['id'],
+                select(_staging_classes.c.id)
+                .select_from(_staging_classes.outerjoin(classes, classes.c.id == _staging_classes.c.id))
+                .where(classes.c.contentHash.is_distinct_from(_staging_classes.c.contentHash))
+            ))
+            self.connection.execute(delete(MeetingTime).where(MeetingTime.classId.in_(changed)))
+            self.connection.execute(delete(Prerequisite).where(Prerequisite.class_id.in_(changed)))
+            self.connection.execute(self.db_client._upsert(
+                Class, CLASS_UPDATE_COLUMNS,
+                from_select=(STAGED_CLASS_COLUMNS, select(*_staging_classes.c).where(_staging_classes.c.id.in_(changed))),
+            ))
+            self.connection.execute(MeetingTime.__table__.insert().from_select(
+                STAGED_MEETING_TIME_COLUMNS,
+                select(*_staging_meeting_times.c).where(_staging_meeting_times.c.classId.in_(changed)),
+            ))
+            self.connection.execute(Prerequisite.__table__.insert().from_select(
+                STAGED_PREREQUISITE_COLUMNS,
+                select(*_staging_prerequisites.c).where(_staging_prerequisites.c.class_id.in_(changed)),
+            ))
+            archived = self.connection.execute(_archive_stale(self.semester, _staging_classes)).rowcount
+            changed_ids = [class_id for (class_id,) in self.connection.execute(changed)]
+
+        suffix = f"-{self.semester}"
+        return {
+            'staged': staged,
+            'changed': [class_id[:-len(suffix)] if class_id.endswith(suffix) else class_id for class_id in changed_ids],
+            'archived': archived,
+        }
+
+    def _build_indexes(self):
+        # Built after loading: cheaper than maintaining them per row, and the unique one rejects duplicates
+        self.connection.exec_driver_sql('CREATE UNIQUE INDEX ix_staging_classes_id ON staging_classes (id)')
+        self.connection.exec_driver_sql('CREATE INDEX ix_staging_meeting_times_class ON staging_meeting_times ("classId")')
+        self.connection.exec_driver_sql('CREATE INDEX ix_staging_prerequisites_class ON staging_prerequisites (class_id)')
+        if self.is_postgres:
+            self.connection.exec_driver_sql('ANALYZE staging_classes, staging_meeting_times, staging_prerequisites')
+
+    def _validate(self, min_ratio: float) -> int:
+        def count(table, *criteria) -> int:
+            return self.connection.scalar(select(func.count()).select_from(table).where(*criteria))
+
+        staged = {
+            'classes': count(_staging_classes),
+            'meeting_times': count(_staging_meeting_times),
+            'prerequisites': count(_staging_prerequisites),
+        }
+        for name, staged_count in staged.items():
+            if staged_count != self.sent[name]:
+                raise StagingValidationError(f"Staged {staged_count} {name} for {self.semester} but sent {self.sent[name]}")
+        if not staged['classes']:
+            # An empty fetch would wipe the semester; treat it as an upstream problem instead
+            raise StagingValidationError(f"No sections staged for {self.semester}")
+
+        live = count(Class.__table__, Class.__table__.c.semester == self.semester, Class.__table__.c.archivedAt.is_(None))
+        if live and staged['classes'] < live * min_ratio:
+            raise StagingValidationError(
+                f"Staged {staged['classes']} sections for {self.semester}, under {min_ratio:.0%} of the {live} live ones"
+            )
+        self.logger.info(
+            f"Staged {staged['classes']} sections, {staged['meeting_times']} meeting times and "
+            f"{staged['prerequisites']} prerequisites for {self.semester} ({live} live)"
+        )
+        return staged['classes']
 
 class SQLAlchemyDatabaseClient:
     def __init__(self):
         self.engine, self.SessionLocal = create_engine_and_session()
         self.logger = logging.getLogger(__name__)
+        ensure_schema(self.engine)
     
     def get_session(self) -> Session:
         return self.SessionLocal()
     
+    def _insert(self, model):
+        # ON CONFLICT is dialect-specific; Postgres in production, SQLite for local runs
+        dialect = postgresql if self.engine.dialect.name == 'postgresql' else sqlite
+        return dialect.insert(model.__table__)
+    
+    def _upsert(self, model, update_columns: Iterable[str], from_select=None):
+        stmt = self._insert(model)
+        if from_select is not None:
+            stmt = stmt.from_select(*from_select)
+        return stmt.on_conflict_do_update(
+            index_elements=[model.__table__.c.id],
+            set_={name: stmt.excluded[name] for name in update_columns},
+        )
+    
+    def _write_batches(self, label: str, rows: List[Any], write_batch, batch_size: int) -> int:
+        """Run write_batch(session, chunk) per chunk, committing once per chunk. Returns rows written."""
+        written = 0
+        for chunk in _chunked(rows, batch_size):
+            session = self.get_session()
+            try:
+                write_batch(session, chunk)
+                session.commit()
+                written += len(chunk)
+            except Exception as e:
+                session.rollback()
+                self.logger.error(f"Error saving batch of {len(chunk)} {label}: {e}")
+            finally:
+                session.close()
+        return written
+    
+    def stage_semester(self, semester: str) -> SemesterStage:
+        """Start a staged full load of one semester; use as a context manager and finish with swap()."""
+        return SemesterStage(self, semester)
+    
+    def get_content_hashes(self, semester: str) -> Dict[str, Optional[str]]:
+        """Stored content hash per raw class ID for a semester"""
+        suffix = f"-{semester}"
+        session = self.get_session()
+        try:
+            rows = session.query(Class.id, Class.contentHash).filter(Class.semester == semester).all()
+            return {
+                (class_id[:-len(suffix)] if class_id.endswith(suffix) else class_id): content_hash
+                for class_id, content_hash in rows
+            }
+        finally:
+            session.close()
+    
+    def save_classes_bulk(self, classes: List[Dict[str, Any]], semester: str = "202510",
+                          batch_size: int = BULK_BATCH_SIZE,
+                          meeting_times_by_class: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> int:
+        """
+        Upsert classes and replace their prerequisites, a batch per statement. With meeting_times_by_class
+        (keyed by raw class ID) each class's meeting times are replaced in the same transaction, so a
+        class and its content hash are never committed without them. Returns classes saved.
+        """
+        # Last occurrence wins, as it would with one save_class call per row
+        rows_by_id = {}
+        for class_data in classes:
+            row = _class_row(class_data, semester)
+            rows_by_id[row['id']] = (row, _prerequisite_rows(row['id'], class_data), class_data['id'])
+        
+        def write_batch(session: Session, chunk):
+            class_ids = [row['id'] for row, _, _ in chunk]
+            session.execute(self._upsert(Class, CLASS_UPDATE_COLUMNS), [row for row, _, _ in chunk])
+            session.query(Prerequisite).filter(Prerequisite.class_id.in_(class_ids)).delete(synchronize_session=False)
+            prerequisites = [prereq for _, prereqs, _ in chunk for prereq in prereqs]
+            if prerequisites:
+                session.execute(Prerequisite.__table__.insert(), prerequisites)
+            if meeting_times_by_class is not None:
+                session.query(MeetingTime).filter(MeetingTime.classId.in_(class_ids)).delete(synchronize_session=False)
+                meeting_times = [
+                    _meeting_time_row(row['id'], mt)
+                    for row, _, raw_id in chunk
+                    for mt in meeting_times_by_class.get(raw_id, [])
+                ]
+                if meeting_times:
+                    session.execute(MeetingTime.__table__.insert(), meeting_times)
+        
+        return self._write_batches('classes', list(rows_by_id.values()), write_batch, batch_size)
+    
     def save_class(self, class_data: Dict[str, Any], semester: str = "202510") -> bool:
         session = self.get_session()
         try:
@@ -119,6 +542,97 @@ class SQLAlchemyDatabaseClient:
             self.logger.error(f"Error saving prerequisites for class {class_id}: {e}")
             session.rollback()
     
+    def update_seats_bulk(self, seat_updates: List[Dict[str, Any]], semester: str = "202510",
+                          batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        Apply availableSeats/totalSeats for existing sections, one UPDATE ... FROM (VALUES ...) per batch.
+        Rows whose counts are unchanged are not rewritten. The seat counts are part of a section's
+        content hash, so an updated row's hash is cleared and the next full load rewrites it.
+        Returns rows updated.
+        """
+        rows = list({
+            f"{seat['id']}-{semester}": {
+                'class_id': f"{seat['id']}-{semester}",
+                'available': seat['availableSeats'],
+                'total': seat['totalSeats'],
+            }
+            for seat in seat_updates
+        }.values())
+        updated = 0
+        
+        def write_batch(session: Session, chunk):
+            nonlocal updated
+            if self.engine.dialect.name == 'postgresql':
+                seats = values(
+                    column('class_id', String), column('available', Integer), column('total', Integer),
+                    name='seats',
+                ).data([(row['class_id'], row['available'], row['total']) for row in chunk])
+                stmt = (
+                    update(Class)
+                    .where(Class.id == seats.c.class_id)
+                    .where(
+                        Class.availableSeats.is_distinct_from(seats.c.available)
+                        | Class.totalSeats.is_distinct_from(seats.c.total)
+                    )
+                    .values(availableSeats=seats.c.available, totalSeats=seats.c.total, contentHash=None)
+                )
+                updated += session.execute(stmt).rowcount
+            else:
+                # SQLite can't alias VALUES columns; fall back to an executemany UPDATE
+                table = Class.__table__
+                stmt = (
+                    update(table)
+                    .where(table.c.id == bindparam('class_id'))
+                    .where(
+                        table.c.availableSeats.is_distinct_from(bindparam('available'))
+                        | table.c.totalSeats.is_distinct_from(bindparam('total'))
+                    )
+                    .values(availableSeats=bindparam('available'), totalSeats=bindparam('total'), contentHash=None)
+                )
+                updated += session.execute(stmt, chunk).rowcount
+        
+        self._write_batches('seat updates', rows, write_batch, batch_size)
+        return updated
+    
+    def archive_stale_classes(self, semester: str, current_class_ids: Iterable[str],
+                              min_ratio: float = MIN_STAGED_RATIO) -> int:
+        """
+        Archive the semester's live sections that are absent from current_class_ids (raw IDs).
+        Archived rows are kept, so scheduled entries that point at them survive, and are hidden from
+        the API. Their content hash is cleared so a section that reappears is rewritten and un-archived.
+        Nothing is archived when current_class_ids is under min_ratio of the live sections, the same
+        guard a staged load applies. Returns the number of sections archived.
+        """
+        id_rows = [{'id': f"{class_id}-{semester}"} for class_id in set(current_class_ids)]
+        if not id_rows:
+            # An empty fetch would archive the whole semester; treat it as an upstream problem instead
+            self.logger.warning(f"No current sections for {semester}; skipping stale-section cleanup")
+            return 0
+        
+        session = self.get_session()
+        try:
+            live = session.query(func.count(Class.id)).filter(Class.semester == semester, Class.archivedAt.is_(None)).scalar()
+            if live and len(id_rows) < live * min_ratio:
+                self.logger.warning(
+                    f"Only {len(id_rows)} current sections for {semester}, under {min_ratio:.0%} of the {live} live ones; "
+                    f"skipping stale-section cleanup"
+                )
+                return 0
+            connection = session.connection()
+            _fetched_class_ids.create(connection, checkfirst=True)
+            session.execute(_fetched_class_ids.delete())
+            session.execute(_fetched_class_ids.insert(), id_rows)
+            result = session.execute(_archive_stale(semester, _fetched_class_ids))
+            _fetched_class_ids.drop(connection)
+            session.commit()
+            return result.rowcount
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error archiving stale sections for {semester}: {e}")
+            return 0
+        finally:
+            session.close()
+    
     def save_meeting_time(self, meeting_time_data: Dict[str, Any], semester: str = "202510") -> bool:
         """Save meeting time data to database using SQLAlchemy"""
         session = self.get_session()
@@ -249,40 +763,30 @@ class SQLAlchemyDatabaseClient:
         finally:
             session.close()
     
+    def save_professors_bulk(self, professors: List[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Upsert professors in batches, refreshing rating fields on conflict. Returns professors saved."""
+        rows = list({row['id']: row for row in map(_professor_row, professors)}.values())
+        
+        def write_batch(session: Session, chunk):
+            session.execute(self._upsert(Professor, PROFESSOR_UPDATE_COLUMNS), chunk)
+        
+        return self._write_batches('professors', rows, write_batch, batch_size)
+    
+    def save_ratings_bulk(self, ratings: List[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Insert ratings in batches, skipping ones already stored. Returns ratings written."""
+        rows = list({row['id']: row for row in map(_rating_row, ratings)}.values())
+        
+        def write_batch(session: Session, chunk):
+            session.execute(self._insert(Rating).on_conflict_do_nothing(index_elements=['id']), chunk)
+        
+        return self._write_batches('ratings', rows, write_batch, batch_size)
+    
     def save_rating(self, rating_data: Dict[str, Any]) -> bool:
         session = self.get_session()
         try:
-            # Check if rating already exists
-            existing_rating = session.query(Rating).filter(Rating.id == rating_data['id']).first()
-            if existing_rating:
-                return True
-            
-            # Create new rating
-            new_rating = Rating(
-                id=rating_data['id'],
-                legacyId=rating_data.get('legacyId'),
-                professorId=rating_data['professorId'],
-                comment=rating_data.get('comment'),
-                class_=rating_data.get('class'),
-                difficultyRating=rating_data.get('difficultyRating'),
-                clarityRating=rating_data.get('clarityRating'),
-                helpfulRating=rating_data.get('helpfulRating'),
-                wouldTakeAgain=rating_data.get('wouldTakeAgain'),
-                grade=rating_data.get('grade'),
-                attendanceMandatory=rating_data.get('attendanceMandatory'),
-                textbookUse=rating_data.get('textbookUse'),
-                isForOnlineClass=rating_data.get('isForOnlineClass'),
-                isForCredit=rating_data.get('isForCredit'),
-                ratingTags=rating_data.get('ratingTags'),
-                flagStatus=rating_data.get('flagStatus'),
-                createdByUser=rating_data.get('createdByUser'),
-                thumbsUpTotal=rating_data.get('thumbsUpTotal', 0),
-                thumbsDownTotal=rating_data.get('thumbsDownTotal', 0)
-            )
-            
-            session.add(new_rating)
+            # Existing ratings are skipped by the database rather than a SELECT per rating
+            session.execute(self._insert(Rating).on_conflict_do_nothing(index_elements=['id']), [_rating_row(rating_data)])
             session.commit()
-            
             return True
             
         except Exception as e:
@@ -290,4 +794,34 @@ class SQLAlchemyDatabaseClient:
             self.logger.error(f"Error saving rating: {e}")
             return False
         finally:
-            session.close() 
\ No newline at end of file
+            session.close()
+    
+    def get_crawl_states(self) -> Dict[str, Dict[str, Any]]:
+        """Ratings high-water mark per professor ID"""
+        session = self.get_session()
+        try:
+            return {
+                state.professorId: {
+                    'numRatings': state.numRatings,
+                    'lastRatingId': state.lastRatingId,
+                    'lastRatingCursor': state.lastRatingCursor,
+                    'lastRatingDate': state.lastRatingDate,
+                }
+                for state in session.query(ProfessorCrawlState).all()
+            }
+        finally:
+            session.close()
+    
+    def save_crawl_states_bulk(self, states: List[Dict[str, Any]], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """Upsert ratings high-water marks (professorId, numRatings, lastRating*). Returns states saved."""
+        rows = list({state['professorId']: {**state, 'crawledAt': datetime.utcnow()} for state in states}.values())
+        
+        def write_batch(session: Session, chunk):
+            stmt = self._insert(ProfessorCrawlState)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProfessorCrawlState.__table__.c.professorId],
+                set_={name: stmt.excluded[name] for name in ('numRatings', 'lastRatingId', 'lastRatingCursor', 'lastRatingDate', 'crawledAt')},
+            )
+            session.execute(stmt, chunk)
+        
+        return self._write_batches('crawl states', rows, write_batch, batch_size)
@@ -0,0 +1,86 @@
+import base64
+import gzip
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+
+from scrapers.clients.cassette import _body_bytes, _build_response, cassette_key
+from scrapers.config.api_config import APIConfig
+
+
+class ConditionalCache:
+    """On-disk ETag/Last-Modified validators and bodies for GET responses, one file per URL, so an
+    unchanged page is revalidated with a conditional request and served from disk on 304."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.stats = {'stored': 0, 'revalidated': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def lookup(self, prepared: requests.PreparedRequest) -> Optional[Dict[str, Any]]:
+        key = cassette_key(prepared.method, prepared.url, _body_bytes(prepared.body))
+        try:
+            with gzip.open(self.path_for(key), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            # A missing or unreadable entry just means an unconditional request
+            return None
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revive(self, entry: Dict[str, Any], prepared: requests.PreparedRequest) -> requests.Response:
+        """Rebuild the cached 200 response for a request the server answered with 304."""
+        self._count('revalidated')
+        return _build_response(entry['response'], prepared)
+
+    def store(self, response: requests.Response):
+        """Keep a response that carries validators; responses without them can't be revalidated."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        prepared = response.request
+        key = cassette_key(prepared.method, prepared.url, _body_bytes(prepared.body))
+        entry = {
+            'url': prepared.url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'response': {
+                'status': response.status_code,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() == 'content-type'},
+                'body': base64.b64encode(response.content).decode('ascii'),
+            },
+        }
+        # Write then rename so a concurrent reader or an interrupted run never sees a partial file
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._count('stored')
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+
+def http_cache_from_env() -> Optional[ConditionalCache]:
+    """Cache in HTTP_CACHE_DIR, or None when it is set empty."""
+    directory = APIConfig.get_http_cache_dir()
+    if not directory:
+        return None
+    return ConditionalCache(directory)
@@ -0,0 +1,238 @@
+import bisect
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.config.api_config import APIConfig
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Upper bounds (seconds) of the response latency histogram buckets; one more bucket holds the rest
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_shared_session: Optional[requests.Session] = None
+_shared_pool_size = 0
+_shared_lock = threading.Lock()
+
+
+def shared_session(pool_size: int = 10) -> requests.Session:
+    """Process-wide session, so every client reuses the same keep-alive pools. The pool grows to
+    the largest size any caller has asked for."""
+    global _shared_session, _shared_pool_size
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = requests.Session()
+        if pool_size > _shared_pool_size:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _shared_session.mount('https://', adapter)
+            _shared_session.mount('http://', adapter)
+            _shared_pool_size = pool_size
+        return _shared_session
+
+
+class RequestFailedError(Exception):
+    """Raised once a request has exhausted its retries; callers must not treat it as an empty result."""
+    pass
+
+
+class AdaptiveRateLimiter:
+    """AIMD rate limiter: additive increase while responses are healthy, multiplicative decrease on
+    throttling, server errors or latency spikes."""
+
+    def __init__(self, initial_rate: float, min_rate: float, max_rate: float,
+                 increase: float = 0.5, decrease: float = 0.5, latency_spike_factor: float = 3.0):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_spike_factor = latency_spike_factor
+        self.latency_ewma: Optional[float] = None
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self, latency: float):
+        with self._lock:
+            if self.latency_ewma is not None and latency > self.latency_spike_factor * self.latency_ewma:
+                self._back_off()
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+
+    def on_throttle(self):
+        with self._lock:
+            self._back_off()
+
+    def _back_off(self):
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        # Push the next slot out so requests already waiting also feel the lower rate
+        self._next_slot = max(self._next_slot, time.monotonic() + 1.0 / self.rate)
+
+
+class RequestExecutor:
+    """Shared HTTP path for the scraper clients: pooled session, timeouts, jittered exponential
+    backoff retries and adaptive rate limiting, with throughput accounting. An optional cassette
+    records successful responses or replays them without touching the network, and an optional
+    conditional cache revalidates GET pages so unchanged ones come back as 304s."""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, pool_size: int = 10,
+                 timeout: Optional[float] = None, max_retries: Optional[int] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, cassette=None, http_cache=None):
+        self.logger = logging.getLogger(__name__)
+        self.cassette = cassette
+        self.http_cache = http_cache
+        self.timeout = timeout or APIConfig.get_request_timeout()
+        self.max_retries = APIConfig.get_max_retries() if max_retries is None else max_retries
+        self.backoff_base = APIConfig.get_backoff_base()
+        self.backoff_max = 30.0
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            initial_rate=1.0 / APIConfig.get_min_request_interval(),
+            min_rate=APIConfig.get_min_request_rate(),
+            max_rate=APIConfig.get_max_request_rate()
+        )
+
+        # Clients share one session; their own headers are merged into each request instead
+        self.session = shared_session(pool_size)
+        self.headers = dict(headers or {})
+
+        self._stats_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'bytes': 0, 'not_modified': 0}
+        self.latency_total = 0.0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs['headers'] = {**self.headers, **(kwargs.get('headers') or {})}
+        last_error: Any = None
+        # stream=True leaves the body unread for incremental decoding; recording needs the whole body
+        streaming = kwargs.get('stream', False) and not (self.cassette is not None and self.cassette.recording)
+
+        if self.cassette is not None and self.cassette.replaying:
+            return self._replay(method, url, **kwargs)
+
+        # Streamed pages are never buffered whole, so they are not cached either
+        cached = None
+        cacheable = self.http_cache is not None and method == 'GET' and not kwargs.get('stream', False)
+        if cacheable:
+            cached = self.http_cache.lookup(self._prepare(method, url, **kwargs))
+            if cached is not None:
+                kwargs['headers'].update(self.http_cache.conditional_headers(cached))
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._record('retries')
+                self._sleep_backoff(attempt, last_error)
+
+            self.rate_limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.rate_limiter.on_throttle()
+                last_error = e
+                self.logger.warning(f"{method} {url} failed (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
+                continue
+
+            latency = time.monotonic() - started
+            self._record('requests')
+            self._record_latency(latency)
+            if streaming:
+                # The body is read by the caller; count what the server says it will send
+                self._record('bytes', int(response.headers.get('Content-Length') or 0))
+            else:
+                self._record('bytes', len(response.content))
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                self.rate_limiter.on_throttle()
+                response.close()
+                last_error = response
+                self.logger.warning(f"{method} {url} returned {response.status_code} (attempt {attempt + 1}/{self.max_retries + 1})")
+                continue
+
+            # Other 4xx responses will not improve on retry
+            response.raise_for_status()
+            self.rate_limiter.on_success(latency)
+            if cached is not None and response.status_code == 304:
+                self._record('not_modified')
+                response = self.http_cache.revive(cached, response.request)
+            elif cacheable:
+                self.http_cache.store(response)
+            if self.cassette is not None and self.cassette.recording:
+                self.cassette.record(response)
+            return response
+
+        self._record('failures')
+        detail = f"status {last_error.status_code}" if isinstance(last_error, requests.Response) else str(last_error)
+        raise RequestFailedError(f"{method} {url} failed after {self.max_retries + 1} attempts: {detail}")
+
+    def _prepare(self, method: str, url: str, **kwargs) -> requests.PreparedRequest:
+        # Prepare exactly as Session.request would so recording and cache keys match
+        request = requests.Request(method, url, params=kwargs.get('params'), data=kwargs.get('data'),
+                                   json=kwargs.get('json'), headers=kwargs.get('headers'))
+        return self.session.prepare_request(request)
+
+    def _replay(self, method: str, url: str, **kwargs) -> requests.Response:
+        response = self.cassette.replay(self._prepare(method, url, **kwargs))
+        self._record('requests')
+        self._record('bytes', len(response.content))
+        return response
+
+    def _sleep_backoff(self, attempt: int, last_error: Any):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        delay = random.uniform(delay / 2, delay)
+        if isinstance(last_error, requests.Response):
+            retry_after = last_error.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+        time.sleep(delay)
+
+    def _record(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _record_latency(self, latency: float):
+        with self._stats_lock:
+            self.latency_total += latency
+            self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def latency_histogram(self) -> Dict[str, int]:
+        """Live responses per latency bucket, keyed by upper bound ('le_0.5s') plus 'gt_10.0s'."""
+        with self._stats_lock:
+            counts = list(self.latency_counts)
+        histogram = {f"le_{bound}s": count for bound, count in zip(LATENCY_BUCKETS, counts)}
+        histogram[f"gt_{LATENCY_BUCKETS[-1]}s"] = counts[-1]
+        return histogram
+
+    def throughput(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        with self._stats_lock:
+            stats = dict(self.stats)
+            responses = sum(self.latency_counts)
+            stats['mean_latency_seconds'] = round(self.latency_total / responses, 4) if responses else None
+        stats.update({
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_second': round(stats['requests'] / elapsed, 2),
+            'bytes_per_second': round(stats['bytes'] / elapsed, 1),
+            'current_rate_limit': round(self.rate_limiter.rate, 2),
+        })
+        return stats
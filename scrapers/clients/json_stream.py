@@ -0,0 +1,112 @@
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CONTINUATION = '.eE+-'
+
+
+class ArrayStream:
+    """
+    Incrementally decode a top-level JSON object from byte chunks, yielding the elements of one
+    array member (e.g. a DataTables `aaData`) as they are completed. Only the current element and
+    one read chunk are buffered. Other top-level members are collected into `meta`; members after
+    the array are available once iteration finishes.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], array_key: str = 'aaData'):
+        self.array_key = array_key
+        self.meta: Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._exhausted = False
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(':')
+            if key == self.array_key:
+                yield from self._iter_array()
+            else:
+                self.meta[key] = self._decode_value()
+            if self._next_char() == '}':
+                return
+            self._pos -= 1
+            self._expect(',')
+
+    def _iter_array(self) -> Iterator[Any]:
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            separator = self._next_char()
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' in {self.array_key}, got {separator!r}")
+
+    def _decode_value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Most likely the value continues in the next chunk
+                if not self._read():
+                    raise
+                continue
+            # A number may continue in the next chunk when it ends at the buffer edge, or stops short
+            # at a fraction or exponent the chunk split (`1.` | `5`, `1e` | `5`)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and (
+                end == len(self._buffer) or self._buffer[end] in _NUMBER_CONTINUATION
+            ) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def _expect(self, char: str):
+        found = self._next_char()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, got {found!r}")
+
+    def _next_char(self) -> str:
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        return self._buffer[self._pos]
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return
+            if not self._read():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def _read(self) -> bool:
+        """Append the next chunk, dropping consumed text. False once the stream is exhausted."""
+        if self._exhausted:
+            return False
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self._buffer += text
+                return True
+        self._buffer += self._utf8.decode(b'', final=True)
+        self._exhausted = True
+        return False
@@ -1,136 +1,303 @@
-import requests
 import json
-import time
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from scrapers.config.api_config import APIConfig, EndpointConfig
 from scrapers.config.queries import QueryTemplates
+from scrapers.clients.http_executor import RequestExecutor
+from scrapers.clients.cassette import cassette_from_env
+
+
+def _ratings_to_fetch(num_ratings: int) -> int:
+    # Determine how many ratings to fetch based on professor's total
+    if num_ratings >= 15:
+        return 15
+    elif num_ratings >= 10:
+        return 10
+    return 5
+
+
+def _truncate_at_rating(edges: List[Dict[str, Any]], rating_id: Optional[str]) -> bool:
+    """Drop edges from rating_id onwards, in place; True when it was found."""
+    if not rating_id:
+        return False
+    for index, edge in enumerate(edges):
+        if (edge.get('node') or {}).get('id') == rating_id:
+            del edges[index:]
+            return True
+    return False
+
+
+def _find_list(data: Any, key: str) -> Optional[List[Any]]:
+    # The departments list sits under the school node; its exact path depends on the configured query
+    if isinstance(data, dict):
+        if isinstance(data.get(key), list):
+            return data[key]
+        for value in data.values():
+            found = _find_list(value, key)
+            if found is not None:
+                return found
+    return None
+
+
+class BatchSizeTuner:
+    """Grows the batch while responses come back fast and small; halves it when latency or payload
+    size overshoots, so batches stay under server-side time and size limits."""
+
+    def __init__(self, initial_size: int, min_size: int = 1, max_size: int = 50,
+                 target_latency: float = 2.0, max_response_bytes: int = 2_000_000):
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.size = max(self.min_size, min(initial_size, self.max_size))
+        self.target_latency = target_latency
+        self.max_response_bytes = max_response_bytes
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float, response_bytes: int):
+        with self._lock:
+            if latency > self.target_latency or response_bytes > self.max_response_bytes:
+                self.size = max(self.min_size, self.size // 2)
+            elif latency < self.target_latency / 2 and response_bytes < self.max_response_bytes / 2:
+                self.size = min(self.max_size, self.size + max(1, self.size // 4))
+
 
 class RateMyProfessorsAPIClient:
 
-    def __init__(self):
+    def __init__(self, max_concurrency: Optional[int] = None):
         self.base_url = EndpointConfig.RATING_API
         self.headers = APIConfig.get_browser_headers()
         self.school_id = EndpointConfig.SCHOOL_ID
         self.logger = logging.getLogger(__name__)
+        self.max_concurrency = max(1, max_concurrency or APIConfig.get_ratings_concurrency())
+        # Sized so concurrent detail fetches each get a keep-alive connection
+        self.executor = RequestExecutor(headers=self.headers, pool_size=self.max_concurrency, cassette=cassette_from_env())
+        self.batch_tuner: Optional[BatchSizeTuner] = None
     
-    def fetch_all_professors(self, school_id: str = None) -> List[Dict[str, Any]]:
-        try:
-            if school_id is None:
-                school_id = self.school_id
-
-            # Get abstracted query and variables
-            query = QueryTemplates.get_professors_search_query()
-            variables = QueryTemplates.get_search_variables(school_id)
-
-            response = requests.post(
-                self.base_url,
-                json={'query': query, 'variables': variables},
-                headers=self.headers
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Debug: Check response structure
-            if data is None:
-                self.logger.error("Response returned None")
-                return []
-            
-            # Navigate to the teachers array
-            if 'data' in data and data['data'] and 'search' in data['data']:
-                teachers = data['data']['search']['teachers']['edges']
-                return teachers
-            else:
-                self.logger.error("Unexpected response structure from fetch_all_professors")
-                return []
-                
-        except Exception as e:
-            self.logger.error(f"Error fetching all professors: {e}")
+    def _post_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a GraphQL document; transport failures raise RequestFailedError after retries."""
+        response = self.executor.post(self.base_url, json={'query': query, 'variables': variables})
+        return response.json()
+    
+    def fetch_professors_page(self, after_cursor: Optional[str] = None, school_id: str = None,
+                              department_id: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch one page of the teacher search, optionally limited to one department;
+        returns the `teachers` connection (edges + pageInfo)."""
+        if school_id is None:
+            school_id = self.school_id
+        
+        variables = QueryTemplates.get_search_variables(school_id, department_id=department_id)
+        variables['after'] = after_cursor
+        data = self._post_graphql(QueryTemplates.get_professors_search_query(), variables)
+        
+        if data and data.get('data') and 'search' in data['data']:
+            return data['data']['search']['teachers'] or {}
+        raise ValueError(f"Unexpected response structure from teacher search: {data}")
+    
+    def fetch_departments(self, school_id: str = None) -> List[Dict[str, Any]]:
+        """Departments ({id, name}) for the school via DEPARTMENTS_QUERY; empty when it isn't configured."""
+        query = QueryTemplates.get_departments_query()
+        if not query:
             return []
+        data = self._post_graphql(query, {'schoolID': school_id or self.school_id})
+        if data.get('errors'):
+            raise ValueError(f"GraphQL errors fetching departments: {data['errors']}")
+        departments = _find_list(data.get('data'), 'departments')
+        return [department for department in departments or [] if department.get('id')]
     
-    def fetch_professor_details(self, professor_id: str, num_ratings: int = 10) -> Optional[Dict[str, Any]]:
-        try:
-            # Determine how many ratings to fetch based on professor's total
-            if num_ratings >= 15:
-                ratings_to_fetch = 15
-            elif num_ratings >= 10:
-                ratings_to_fetch = 10
+    def iter_professor_pages(self, department_id: Optional[str] = None, school_id: str = None) -> Iterator[List[Dict[str, Any]]]:
+        """Walk a teacher search cursor to the end, yielding each page's edges"""
+        after_cursor = None
+        while True:
+            page = self.fetch_professors_page(after_cursor, school_id, department_id)
+            edges = page.get('edges') or []
+            if edges:
+                yield edges
+            page_info = page.get('pageInfo') or {}
+            after_cursor = page_info.get('endCursor')
+            if not edges or not page_info.get('hasNextPage'):
+                return
+    
+    def fetch_all_professors(self, school_id: str = None) -> List[Dict[str, Any]]:
+        teachers = self.fetch_professors_page(school_id=school_id)
+        return teachers.get('edges', [])
+    
+    def fetch_professor_details(self, professor_id: str, num_ratings: int = 10,
+                                known_rating_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        ratings_to_fetch = _ratings_to_fetch(num_ratings)
+        query = QueryTemplates.get_professor_details_query(ratings_to_fetch)
+        data = self._post_graphql(query, {"id": professor_id})
+        
+        # Check for errors first
+        if 'errors' in data and data['errors']:
+            self.logger.error(f"GraphQL errors: {data['errors']}")
+            return None
+        
+        if 'data' in data and 'node' in data['data']:
+            return self._complete_ratings(professor_id, data['data']['node'], ratings_to_fetch, known_rating_id)
+        else:
+            self.logger.error(f"No professor data found for ID: {professor_id}")
+            return None
+    
+    def fetch_professor_details_batch(self, professors: List[Tuple[str, int]], known_ratings: Optional[Dict[str, str]] = None
+                                      ) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Fetch details for several professors in one aliased GraphQL document. All professors in the
+        batch must share a ratings page size. Returns (professor_id, details, error) per professor;
+        a GraphQL error on one alias only fails that professor.
+        """
+        known_ratings = known_ratings or {}
+        ratings_to_fetch = _ratings_to_fetch(professors[0][1])
+        query = QueryTemplates.get_batched_details_query(len(professors), ratings_to_fetch)
+        variables = {f'id{i}': professor_id for i, (professor_id, _) in enumerate(professors)}
+        
+        started = time.monotonic()
+        response = self.executor.post(self.base_url, json={'query': query, 'variables': variables})
+        if self.batch_tuner is not None:
+            self.batch_tuner.observe(time.monotonic() - started, len(response.content))
+        data = response.json()
+        
+        nodes = data.get('data') or {}
+        errors = {
+            str(error['path'][0]): error.get('message')
+            for error in data.get('errors') or []
+            if error.get('path')
+        }
+        results = []
+        for i, (professor_id, _) in enumerate(professors):
+            node = nodes.get(f'p{i}')
+            if node:
+                details = self._complete_ratings(professor_id, node, ratings_to_fetch, known_ratings.get(professor_id))
+                results.append((professor_id, details, None))
             else:
-                ratings_to_fetch = 5
-            
-            query = QueryTemplates.get_professor_details_query(ratings_to_fetch)
-            
-            payload = {
-                "query": query,
-                "variables": {
-                    "id": professor_id
-                }
-            }
-            
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            data = response.json()
+                detail = errors.get(f'p{i}') or data.get('errors') or 'no data'
+                results.append((professor_id, None, ValueError(f"No professor data for {professor_id}: {detail}")))
+        return results
+    
+    def _complete_ratings(self, professor_id: str, professor_data: Dict[str, Any], ratings_to_fetch: int,
+                          known_rating_id: Optional[str] = None) -> Dict[str, Any]:
+        # Check if we need to paginate for more ratings
+        ratings = professor_data.get('ratings', {}).get('edges', [])
+        page_info = professor_data.get('ratings', {}).get('pageInfo', {})
+        
+        # Ensure ratings is a list
+        if ratings is None:
+            ratings = []
+        
+        # Ratings arrive newest first; everything from the last stored rating on is already saved
+        reached_known = _truncate_at_rating(ratings, known_rating_id)
+        
+        # If we have more pages and want more ratings, fetch them
+        if not reached_known and page_info.get('hasNextPage') and len(ratings) < ratings_to_fetch:
+            additional_ratings = self._fetch_additional_ratings(
+                professor_id, ratings_to_fetch - len(ratings), page_info.get('endCursor')
+            )
+            if additional_ratings:
+                _truncate_at_rating(additional_ratings, known_rating_id)
+                ratings.extend(additional_ratings)
+        
+        if professor_data.get('ratings') is not None:
+            professor_data['ratings']['edges'] = ratings
+        return professor_data
+    
+    def iter_professor_details(self, professors: List[Tuple[str, int]], concurrency: Optional[int] = None,
+                               batch_size: int = 1, known_ratings: Optional[Dict[str, str]] = None
+                               ) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """
+        Fetch details (and extra rating pages) for (professor_id, num_ratings) pairs on a bounded
+        thread pool. Yields (professor_id, details, error) in completion order; a failed professor
+        yields its exception instead of aborting the rest. batch_size > 1 packs lookups into aliased
+        documents, starting at that size and tuning it from response latency and size. known_ratings
+        maps professor IDs to their newest stored rating ID; ratings from there on are not returned.
+        """
+        known_ratings = known_ratings or {}
+        concurrency = self.max_concurrency if concurrency is None else max(1, min(concurrency, self.max_concurrency))
+        if batch_size > 1 and QueryTemplates.get_batched_details_query(1) is not None:
+            yield from self._iter_batched_details(professors, concurrency, batch_size, known_ratings)
+            return
+        
+        # A sliding window of `concurrency` requests, refilled as each one completes, so closing the
+        # generator early (Ctrl-C, a failed flush) cancels what is queued instead of finishing the crawl
+        professors = iter(professors)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ratings') as executor:
+            def submit_next(window):
+                for professor_id, num_ratings in islice(professors, 1):
+                    window[executor.submit(self.fetch_professor_details, professor_id, num_ratings, known_ratings.get(professor_id))] = professor_id
             
-            # Check for errors first
-            if 'errors' in data and data['errors']:
-                self.logger.error(f"GraphQL errors: {data['errors']}")
-                return None
+            window = {}
+            try:
+                for _ in range(concurrency):
+                    submit_next(window)
+                while window:
+                    done, _ = wait(window, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        professor_id = window.pop(future)
+                        submit_next(window)
+                        try:
+                            yield professor_id, future.result(), None
+                        except Exception as e:
+                            yield professor_id, None, e
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _iter_batched_details(self, professors: List[Tuple[str, int]], concurrency: int, batch_size: int,
+                              known_ratings: Dict[str, str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+        # Recordings are keyed by request body, so with a cassette the batches must not depend on live
+        # latency: the size stays fixed and a replay rebuilds exactly the recorded batches
+        fixed = self.executor.cassette is not None
+        max_size = APIConfig.get_max_details_batch_size()
+        size = max(1, min(batch_size, max_size))
+        self.batch_tuner = BatchSizeTuner(
+            initial_size=size,
+            min_size=size if fixed else 1,
+            max_size=size if fixed else max_size,
+            target_latency=APIConfig.get_details_batch_target_latency(),
+        )
+        # Sorted by page size so each batch can share one ratings(first: N) document
+        pending = deque(sorted(professors, key=lambda professor: _ratings_to_fetch(professor[1])))
+        
+        def take_batch() -> List[Tuple[str, int]]:
+            # Sized at submit time so each batch picks up the tuner's latest estimate
+            batch = []
+            while pending and len(batch) < self.batch_tuner.size:
+                if batch and _ratings_to_fetch(pending[0][1]) != _ratings_to_fetch(batch[0][1]):
+                    break
+                batch.append(pending.popleft())
+            return batch
+        
+        # Same bounded window as the unbatched path, one batch per in-flight request
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ratings-batch') as executor:
+            def submit_next(window):
+                batch = take_batch()
+                if batch:
+                    window[executor.submit(self.fetch_professor_details_batch, batch, known_ratings)] = batch
             
-            if 'data' in data and 'node' in data['data']:
-                professor_data = data['data']['node']
-                
-                # Check if we need to paginate for more ratings
-                ratings = professor_data.get('ratings', {}).get('edges', [])
-                page_info = professor_data.get('ratings', {}).get('pageInfo', {})
-                
-                # Ensure ratings is a list
-                if ratings is None:
-                    ratings = []
-                
-                # If we have more pages and want more ratings, fetch them
-                if page_info.get('hasNextPage') and len(ratings) < ratings_to_fetch:
-                    additional_ratings = self._fetch_additional_ratings(
-                        professor_id, ratings_to_fetch - len(ratings), page_info.get('endCursor')
-                    )
-                    if additional_ratings:
-                        ratings.extend(additional_ratings)
-                    professor_data['ratings']['edges'] = ratings
-                
-                return professor_data
-            else:
-                self.logger.error(f"No professor data found for ID: {professor_id}")
-                return None
-                
-        except Exception as e:
-            self.logger.error(f"Error fetching professor details: {e}")
-            return None
+            window = {}
+            try:
+                for _ in range(concurrency):
+                    submit_next(window)
+                while window:
+                    done, _ = wait(window, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch = window.pop(future)
+                        submit_next(window)
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            results = [(professor_id, None, e) for professor_id, _ in batch]
+                        yield from results
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self.logger.info(f"Batched detail fetch settled at {self.batch_tuner.size} professors per request")
     
     def _fetch_additional_ratings(self, professor_id: str, num_additional: int, cursor: str) -> List[Dict[str, Any]]:
-        try:
-            query = QueryTemplates.get_ratings_pagination_query(num_additional)
-            
-            payload = {
-                "query": query,
-                "variables": {
-                    "id": professor_id,
-                    "cursor": cursor
-                }
-            }
-            
-            response = requests.post(self.base_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'data' in data and 'node' in data['data']:
-                return data['data']['node'].get('ratings', {}).get('edges', [])
-            else:
-                return []
-                
-        except Exception as e:
-            self.logger.error(f"Error fetching additional ratings: {e}")
+        query = QueryTemplates.get_ratings_pagination_query(num_additional)
+        data = self._post_graphql(query, {"id": professor_id, "cursor": cursor})
+        
+        if 'data' in data and 'node' in data['data']:
+            return data['data']['node'].get('ratings', {}).get('edges', [])
+        else:
             return []
-    
- 
\ No newline at end of file
@@ -1,6 +1,8 @@
 import os
 from typing import Dict, Any
 
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
 class APIConfig:
 
     @staticmethod
@@ -10,7 +12,8 @@ class APIConfig:
             'User-Agent': os.getenv("BROWSER_USER_AGENT", "Academic-Bot/1.0"),
             'Accept': '*/*',
             'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
+            # Only the encodings urllib3 can decode here (br/zstd when their packages are installed)
+            'Accept-Encoding': DEFAULT_ACCEPT_ENCODING,
         }
 
     @staticmethod
@@ -20,6 +23,65 @@ class APIConfig:
             'User-Agent': os.getenv("FORM_USER_AGENT", "Academic-Bot/1.0")
         }
 
+    @staticmethod
+    def get_max_concurrency() -> int:
+        return int(os.getenv("CLASSNAV_CONCURRENCY", "4"))
+
+    @staticmethod
+    def get_ratings_concurrency() -> int:
+        return int(os.getenv("RATINGS_CONCURRENCY", "4"))
+
+    @staticmethod
+    def get_details_batch_size() -> int:
+        # Professors per aliased details request; 1 sends one request per professor
+        return int(os.getenv("RATINGS_BATCH_SIZE", "1"))
+
+    @staticmethod
+    def get_max_details_batch_size() -> int:
+        return int(os.getenv("RATINGS_MAX_BATCH_SIZE", "50"))
+
+    @staticmethod
+    def get_details_batch_target_latency() -> float:
+        return float(os.getenv("RATINGS_BATCH_TARGET_LATENCY", "2.0"))
+
+    @staticmethod
+    def get_request_timeout() -> float:
+        return float(os.getenv("REQUEST_TIMEOUT", "30"))
+
+    @staticmethod
+    def get_min_request_interval() -> float:
+        return float(os.getenv("MIN_REQUEST_INTERVAL", "0.1"))
+
+    @staticmethod
+    def get_max_retries() -> int:
+        return int(os.getenv("MAX_RETRIES", "5"))
+
+    @staticmethod
+    def get_backoff_base() -> float:
+        return float(os.getenv("RETRY_BACKOFF_BASE", "1.0"))
+
+    @staticmethod
+    def get_min_request_rate() -> float:
+        return float(os.getenv("MIN_REQUEST_RATE", "0.5"))
+
+    @staticmethod
+    def get_max_request_rate() -> float:
+        return float(os.getenv("MAX_REQUEST_RATE", "50"))
+
+    @staticmethod
+    def get_cassette_mode() -> str:
+        # '' (live requests), 'record' or 'replay'
+        return os.getenv("HTTP_CASSETTE_MODE", "").strip().lower()
+
+    @staticmethod
+    def get_cassette_dir() -> str:
+        return os.getenv("HTTP_CASSETTE_DIR", "scrapers/cassettes")
+
+    @staticmethod
+    def get_http_cache_dir() -> str:
+        # ETag/Last-Modified cache for GET pages; set empty to disable
+        return os.getenv("HTTP_CACHE_DIR", "scrapers/http_cache").strip()
+
     @staticmethod
     def get_pagination_params(start: int = 0, length: int = 1000) -> Dict[str, Any]:
         base_params = {
@@ -1,4 +1,6 @@
 import os
+import re
+from typing import Optional
 
 class QueryTemplates:
 
@@ -6,6 +8,11 @@ class QueryTemplates:
     def get_professors_search_query() -> str:
         return os.getenv("PROFESSORS_SEARCH_QUERY", "")
 
+    @staticmethod
+    def get_departments_query() -> str:
+        # Lists the school's departments; receives $schoolID
+        return os.getenv("DEPARTMENTS_QUERY", "")
+
     @staticmethod
     def get_professor_details_query(num_ratings: int = 10) -> str:
         query = os.getenv("PROFESSOR_DETAILS_QUERY", "")
@@ -13,6 +20,30 @@ class QueryTemplates:
             return query.replace("{num_ratings}", str(num_ratings))
         return ""
 
+    @staticmethod
+    def get_batched_details_query(count: int, num_ratings: int = 10) -> Optional[str]:
+        """
+        Pack `count` copies of the details query's node(id: $id) lookup into one document,
+        aliased p0..pN-1 with variables $id0..$idN-1. Fragment definitions after the operation
+        are kept. Returns None when the configured template doesn't have that shape.
+        """
+        query = QueryTemplates.get_professor_details_query(num_ratings)
+        lookup = re.search(r'node\(\s*id:\s*\$id\s*\)', query)
+        operation_start = query.find('{')
+        if not lookup or operation_start < 0:
+            return None
+        selection_start = query.find('{', lookup.end())
+        selection_end = _matching_brace(query, selection_start)
+        operation_end = _matching_brace(query, operation_start)
+        if selection_end is None or operation_end is None:
+            return None
+        
+        selection = query[selection_start:selection_end + 1]
+        fragments = query[operation_end + 1:].strip()
+        variables = ', '.join(f'$id{i}: ID!' for i in range(count))
+        lookups = ' '.join(f'p{i}: node(id: $id{i}) {selection}' for i in range(count))
+        return f'query BatchedProfessorDetails({variables}) {{ {lookups} }} {fragments}'.strip()
+
     @staticmethod
     def get_ratings_pagination_query(num_ratings: int = 10) -> str:
         query = os.getenv("RATINGS_PAGINATION_QUERY", "")
@@ -21,14 +52,27 @@ class QueryTemplates:
         return ""
 
     @staticmethod
-    def get_search_variables(school_id: str, query_text: str = "") -> dict:
+    def get_search_variables(school_id: str, query_text: str = "", department_id: Optional[str] = None) -> dict:
         return {
             "query": {
                 "text": query_text,
                 "schoolID": school_id,
                 "fallback": True,
-                "departmentID": None
+                "departmentID": department_id
             },
             "schoolID": school_id,
             "includeSchoolFilter": True
         }
+
+def _matching_brace(text: str, open_index: int) -> Optional[int]:
+    if open_index < 0:
+        return None
+    depth = 0
+    for index in range(open_index, len(text)):
+        if text[index] == '{':
+            depth += 1
+        elif text[index] == '}':
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
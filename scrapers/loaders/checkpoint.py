@@ -0,0 +1,75 @@
+import json
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Set
+
+
+class CrawlCheckpoint:
+    """Finished and failed item IDs for one crawl, persisted as JSON so an interrupted crawl resumes
+    instead of restarting. Mark items done only after their data is committed. A checkpoint belongs
+    to the run that started it: start() discards whatever an earlier run left behind."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.started_at: Optional[str] = None
+        self.finished = False
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.completed = set(data.get('completed', []))
+            self.failed = set(data.get('failed', []))
+            self.started_at = data.get('started_at')
+            self.finished = bool(data.get('finished', False))
+
+    def start(self):
+        """Begin a new crawl, dropping any earlier run's progress."""
+        self.completed.clear()
+        self.failed.clear()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.finished = False
+        self.flush()
+
+    def is_done(self, item_id: str) -> bool:
+        return item_id in self.completed
+
+    def mark_done(self, item_ids: Iterable[str]):
+        item_ids = list(item_ids)
+        self.completed.update(item_ids)
+        self.failed.difference_update(item_ids)
+        self.flush()
+
+    def mark_failed(self, item_ids: Iterable[str]):
+        self.failed.update(item_ids)
+        self.flush()
+
+    def finish(self):
+        """Every pending item was attempted: completed IDs are no longer needed, failures are kept for a retry."""
+        self.completed.clear()
+        self.finished = True
+        if self.failed:
+            self.flush()
+        else:
+            self.clear()
+
+    def flush(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so a crash mid-write leaves the previous checkpoint intact
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'started_at': self.started_at,
+                'finished': self.finished,
+                'completed': sorted(self.completed),
+                'failed': sorted(self.failed),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.completed.clear()
+        self.failed.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,6 +1,10 @@
 import os
+import json
 import sys
+import time
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
 from dotenv import load_dotenv
@@ -8,8 +12,10 @@ from dotenv import load_dotenv
 load_dotenv('./scrapers/.env')
 
 from scrapers.clients.classes_client import ClassNavAPIClient
-from scrapers.processors.classes_processor import ClassDataProcessor
-from scrapers.clients.database_client import SQLAlchemyDatabaseClient
+from scrapers.processors.classes_processor import ClassDataProcessor, create_parse_pool
+from scrapers.clients.database_client import SQLAlchemyDatabaseClient, BULK_BATCH_SIZE
+from scrapers.loaders.pipeline import buffered, batched
+from scrapers.loaders.run_report import RunReport, DEFAULT_REPORT_DIR, write_run_report
 
 def setup_logging():
     logging.basicConfig(
@@ -22,13 +28,84 @@ def setup_logging():
     
     return logging.getLogger(__name__)
 
-def load_classes_to_database(test_mode: bool = True, semester: str = '202510'):
+# Sections the app serves; everything else is dropped before it reaches the database
+LOADED_DELIVERIES = ('Traditional In-Person', 'Asynchronous Online', 'Synchronous Web')
+LOADED_TYPES = ('Lecture', 'Lab', 'Lecture/Lab Combined', 'Lab with No Credit')
+
+# Pages fetched ahead of parsing, and upsert batches parsed ahead of writing
+PAGE_BUFFER = 2
+BATCH_BUFFER = 2
+
+# Default page size for --stream: few round trips, without holding the page in memory
+STREAMED_PAGE_SIZE = 10000
+
+def _timed_pages(pages, report: RunReport):
+    """Yield pages, booking the time spent waiting for each to the report's fetch_wait stage"""
+    pages = iter(pages)
+    while True:
+        started = time.perf_counter()
+        page = next(pages, None)
+        if page is None:
+            return
+        report.add_time('fetch_wait', time.perf_counter() - started, len(page))
+        yield page
+
+def _valid_classes(pages, data_processor: ClassDataProcessor, counts: Dict[str, int],
+                   valid_ids: List[str], report: RunReport, parse_pool=None):
+    """Parse, filter and validate page by page, yielding every section that passes"""
+    for page in _timed_pages(pages, report):
+        counts['fetched'] += len(page)
+        with report.stage('parse', rows=len(page)):
+            parsed = data_processor.process_classes_parallel(page, executor=parse_pool)
+        kept = [
+            class_data for class_data in parsed
+            # Include Traditional In-Person, Asynchronous Online, and Synchronous Web
+            # Include Lecture, Lab, Lecture/Lab Combined, and Lab with No Credit
+            if class_data.get('delivery', '') in LOADED_DELIVERIES and class_data.get('type', '') in LOADED_TYPES
+        ]
+        valid = [class_data for class_data in kept if data_processor.validate_class_data(class_data)]
+        counts['kept'] += len(kept)
+        counts['invalid'] += len(kept) - len(valid)
+        valid_ids.extend(class_data['id'] for class_data in valid)
+        yield from valid
+
+def _changed_classes(pages, data_processor: ClassDataProcessor, stored_hashes: Dict[str, Any],
+                     counts: Dict[str, int], valid_ids: List[str], report: RunReport, parse_pool=None):
+    """Like _valid_classes, but yielding only sections whose content hash changed"""
+    # Only new or changed sections are written; a no-op reload touches no rows
+    for class_data in _valid_classes(pages, data_processor, counts, valid_ids, report, parse_pool):
+        if stored_hashes.get(class_data['id']) != class_data['contentHash']:
+            yield class_data
+        else:
+            counts['unchanged'] += 1
+
+def _meeting_times_by_class(classes: List[Dict[str, Any]], data_processor: ClassDataProcessor) -> Dict[str, List[Dict[str, Any]]]:
+    meeting_times_by_class = {}
+    for class_data in classes:
+        meeting_times = meeting_times_by_class.setdefault(class_data['id'], [])
+        for meeting_time in class_data.get('meetingTimes', []) or []:
+            processed_meeting_time = data_processor.process_meeting_time_data(meeting_time, class_data['id'])
+            if processed_meeting_time and data_processor.validate_meeting_time_data(processed_meeting_time):
+                meeting_times.append(processed_meeting_time)
+    return meeting_times_by_class
+
+def load_classes_to_database(test_mode: bool = True, semester: str = '202510', concurrency: int = None,
+                             changed_ids_dir: str = None, parse_workers: int = None,
+                             page_size: int = None, stream: bool = False, staged: bool = True,
+                             report_dir: str = DEFAULT_REPORT_DIR) -> Dict[str, Any]:
     
     # Set up logging and clients
     logger = setup_logging()
-    api_client = ClassNavAPIClient()
+    api_client = ClassNavAPIClient(max_concurrency=concurrency)
     db_client = SQLAlchemyDatabaseClient()
     data_processor = ClassDataProcessor()
+    parse_pool = create_parse_pool(parse_workers) if parse_workers and parse_workers > 1 else None
+    report = RunReport('classes', semester, test_mode=test_mode, concurrency=api_client.max_concurrency,
+                       parse_workers=parse_workers, page_size=page_size, stream=stream, staged=staged)
+    report.watch_engine(db_client.engine)
+    
+    summary = {'semester': semester, 'fetched': 0, 'kept': 0, 'saved': 0, 'unchanged': 0, 'failed': 0, 'archived': 0, 'error': None}
+    started = time.monotonic()
     
     try:
         logger.info("Starting to load OU class data to database...")
@@ -37,70 +114,173 @@ def load_classes_to_database(test_mode: bool = True, semester: str = '202510'):
             # Fetch a small sample for testing (offset 0 has classes with full meeting times)
             raw_classes = api_client.fetch_classes(0, 100, semester)
             if raw_classes and raw_classes.get('aaData'):
-                classes_data = raw_classes['aaData']
+                pages = [raw_classes['aaData']]
             else:
                 logger.error("Failed to fetch test data")
-                return
+                summary['error'] = "Failed to fetch test data"
+                return summary
         else:
-            # Fetch all classes
-            classes_data = api_client.fetch_all_classes(semester)
-        
-        logger.info(f"Processing {len(classes_data)} classes...")
+            # Stream pages: fetching, parsing and writing overlap, and only a few pages are held at once
+            if stream:
+                # Large pages decoded row by row off the socket; chunks of rows flow on as they arrive
+                fetched_pages = api_client.iter_streamed_pages(semester, page_size or STREAMED_PAGE_SIZE)
+            else:
+                fetched_pages = api_client.iter_class_pages(semester, page_size or 1000)
+            pages = buffered(fetched_pages, PAGE_BUFFER, 'classnav-fetch')
         
-        processed_classes = data_processor.process_classes_batch(classes_data)
+        counts = {'fetched': 0, 'kept': 0, 'invalid': 0, 'unchanged': 0}
+        valid_ids, changed_ids = [], []
+        successful_saves = failed_saves = 0
         
-        # Filter classes based on criteria
-        filtered_classes = []
-        for class_data in processed_classes:
-            delivery = class_data.get('delivery', '')
-            class_type = class_data.get('type', '')
+        if staged and not test_mode:
+            # Everything lands in staging first; the live semester changes in one transaction at the end
+            with db_client.stage_semester(semester) as stage:
+                valid = _valid_classes(pages, data_processor, counts, valid_ids, report, parse_pool)
+                for batch in buffered(batched(valid, BULK_BATCH_SIZE), BATCH_BUFFER, 'classes-parse'):
+                    with report.stage('meeting_times', rows=len(batch)):
+                        meeting_times_by_class = _meeting_times_by_class(batch, data_processor)
+                    with report.stage('db_stage', rows=len(batch)):
+                        stage.add(batch, meeting_times_by_class)
+                with report.stage('db_swap'):
+                    result = stage.swap()
+            changed_ids = result['changed']
+            successful_saves = len(changed_ids)
+            counts['unchanged'] = result['staged'] - len(changed_ids)
+            summary['archived'] = result['archived']
+            logger.info(f"{len(changed_ids)} new or changed sections, {counts['unchanged']} unchanged")
+            logger.info(f"Archived {result['archived']} stale sections")
+        else:
+            stored_hashes = db_client.get_content_hashes(semester)
+            changed = _changed_classes(pages, data_processor, stored_hashes, counts, valid_ids, report, parse_pool)
+            for batch in buffered(batched(changed, BULK_BATCH_SIZE), BATCH_BUFFER, 'classes-parse'):
+                # Classes, prerequisites and meeting times (replaced as a set so reruns don't duplicate
+                # them) commit together, so a stored content hash always has its meeting times
+                with report.stage('meeting_times', rows=len(batch)):
+                    meeting_times_by_class = _meeting_times_by_class(batch, data_processor)
+                with report.stage('db_write', rows=len(batch)):
+                    saved = db_client.save_classes_bulk(batch, semester, meeting_times_by_class=meeting_times_by_class)
+                successful_saves += saved
+                failed_saves += len(batch) - saved
+                # A failed batch is left out so its IDs aren't published as changed
+                if saved == len(batch):
+                    changed_ids.extend(class_data['id'] for class_data in batch)
+            logger.info(f"{len(changed_ids)} new or changed sections, {counts['unchanged']} unchanged")
             
-            # Include Traditional In-Person, Asynchronous Online, and Synchronous Web
-            if delivery in ['Traditional In-Person', 'Asynchronous Online', 'Synchronous Web']:
-                # Include Lecture, Lab, Lecture/Lab Combined, and Lab with No Credit
-                if class_type in ['Lecture', 'Lab', 'Lecture/Lab Combined', 'Lab with No Credit']:
-                    filtered_classes.append(class_data)
+            # Only a complete fetch knows which sections the registrar dropped
+            complete = api_client.last_fetch_total is not None and counts['fetched'] == api_client.last_fetch_total
+            if not test_mode and failed_saves == 0 and not complete:
+                logger.warning(f"Fetched {counts['fetched']} sections but the API reported {api_client.last_fetch_total}; "
+                               f"skipping stale-section cleanup")
+            elif not test_mode and failed_saves == 0:
+                with report.stage('db_stale'):
+                    archived = db_client.archive_stale_classes(semester, valid_ids)
+                summary['archived'] = archived
+                logger.info(f"Archived {archived} stale sections")
         
-        processed_classes = filtered_classes
+        failed_saves += counts['invalid']
+        summary.update({key: counts[key] for key in ('fetched', 'kept', 'unchanged')})
         
-        # Save classes to database
-        successful_saves = 0
-        failed_saves = 0
+        if changed_ids_dir:
+            write_changed_ids(changed_ids_dir, semester, changed_ids)
         
-        for i, class_data in enumerate(processed_classes, 1):
-            try:
-                # Validate class data
-                if not data_processor.validate_class_data(class_data):
-                    failed_saves += 1
-                    continue
-
-                # Save class to database
-                if db_client.save_class(class_data, semester):
-                    successful_saves += 1
-                    
-                    # Save meeting times for this class
-                    meeting_times = class_data.get('meetingTimes', [])
-                    if meeting_times:
-                        for meeting_time in meeting_times:
-                            processed_meeting_time = data_processor.process_meeting_time_data(meeting_time, class_data['id'])
-                            if processed_meeting_time and data_processor.validate_meeting_time_data(processed_meeting_time):
-                                if not db_client.save_meeting_time(processed_meeting_time, semester):
-                                    logger.error(f"Failed to save meeting time for class {class_data['id']}")
-                else:
-                    failed_saves += 1
-                    
-            except Exception as e:
-                logger.error(f"Error processing class {class_data.get('id', 'Unknown')}: {e}")
-                failed_saves += 1
-        logger.info(f"Total classes processed: {len(processed_classes)}")
+        logger.info(f"Total classes processed: {counts['kept']}")
         logger.info(f"Successfully saved: {successful_saves}")
         logger.info(f"Failed to save: {failed_saves}")
-        
-        # Get database stats
-        stats = db_client.get_class_stats()
+        summary['saved'] = successful_saves
+        summary['failed'] = failed_saves
         
     except Exception as e:
         logger.error(f"Error in load_classes_to_database: {e}")
+        summary['error'] = str(e)
+    finally:
+        db_client.engine.dispose()
+        if parse_pool is not None:
+            parse_pool.shutdown()
+        summary['elapsed_seconds'] = round(time.monotonic() - started, 2)
+        if report_dir:
+            # Prerequisite parsing time is only visible when rows were parsed in this process
+            if parse_pool is None:
+                report.add_time('prerequisites', data_processor.prerequisite_seconds, rows=summary['fetched'])
+            summary['report'] = write_run_report(logger, report, report_dir, summary, api_client.executor)
+    
+    return summary
+
+def refresh_seats(semester: str = '202510', concurrency: int = None, report_dir: str = DEFAULT_REPORT_DIR) -> Dict[str, Any]:
+    """Update only seat counts for existing sections; no prerequisite parsing or full row writes"""
+    logger = setup_logging()
+    api_client = ClassNavAPIClient(max_concurrency=concurrency)
+    db_client = SQLAlchemyDatabaseClient()
+    data_processor = ClassDataProcessor()
+    report = RunReport('seats', semester, concurrency=api_client.max_concurrency)
+    report.watch_engine(db_client.engine)
+    
+    summary = {'semester': semester, 'fetched': 0, 'updated': 0, 'error': None}
+    started = time.monotonic()
+    
+    try:
+        logger.info(f"Refreshing seat availability for {semester}...")
+        with report.stage('fetch'):
+            classes_data = api_client.fetch_all_classes(semester)
+        with report.stage('parse', rows=len(classes_data)):
+            seat_updates = [update for update in map(data_processor.extract_seat_update, classes_data) if update]
+        summary['fetched'] = len(seat_updates)
+        with report.stage('db_write', rows=len(seat_updates)):
+            summary['updated'] = db_client.update_seats_bulk(seat_updates, semester)
+        logger.info(f"Seat counts changed for {summary['updated']} of {len(seat_updates)} sections")
+    except Exception as e:
+        logger.error(f"Error in refresh_seats: {e}")
+        summary['error'] = str(e)
+    finally:
+        db_client.engine.dispose()
+    
+    summary['elapsed_seconds'] = round(time.monotonic() - started, 2)
+    logger.info(f"Seat refresh finished in {summary['elapsed_seconds']}s")
+    if report_dir:
+        summary['report'] = write_run_report(logger, report, report_dir, summary, api_client.executor)
+    return summary
+
+def load_semesters_in_parallel(semesters: List[str], test_mode: bool = True, concurrency: int = None, workers: int = None,
+                               changed_ids_dir: str = None, staged: bool = True,
+                               report_dir: str = DEFAULT_REPORT_DIR) -> List[Dict[str, Any]]:
+    """Run the fetch -> process -> save pipeline for several semesters at once, one worker process each."""
+    logger = setup_logging()
+    workers = workers or len(semesters)
+    logger.info(f"Loading semesters {', '.join(semesters)} with {workers} worker processes...")
+    
+    # Spawn rather than fork so no worker inherits the parent's pooled DB connections
+    context = multiprocessing.get_context('spawn')
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {semester: executor.submit(load_classes_to_database, test_mode, semester, concurrency, changed_ids_dir,
+                                               staged=staged, report_dir=report_dir) for semester in semesters}
+        for semester, future in futures.items():
+            try:
+                summaries.append(future.result())
+            except Exception as e:
+                summaries.append({'semester': semester, 'fetched': 0, 'kept': 0, 'saved': 0, 'failed': 0, 'error': str(e)})
+    
+    log_summary_report(logger, summaries)
+    return summaries
+
+def write_changed_ids(directory: str, semester: str, class_ids: List[str]) -> str:
+    """Write the IDs written this run to <directory>/changed-<semester>.json for downstream cache invalidation"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"changed-{semester}.json")
+    with open(path, 'w') as f:
+        json.dump({'semester': semester, 'changed': [f"{class_id}-{semester}" for class_id in class_ids]}, f)
+    return path
+
+def log_summary_report(logger, summaries: List[Dict[str, Any]]):
+    logger.info("MULTI-SEMESTER LOAD SUMMARY")
+    for summary in summaries:
+        status = f"ERROR: {summary['error']}" if summary.get('error') else "ok"
+        logger.info(
+            f"  {summary['semester']}: fetched={summary['fetched']} kept={summary['kept']} saved={summary['saved']} "
+            f"unchanged={summary.get('unchanged', 0)} "
+            f"failed={summary['failed']} archived={summary.get('archived', 0)} time={summary.get('elapsed_seconds', '-')}s [{status}]"
+        )
+    totals = {key: sum(s[key] for s in summaries) for key in ('fetched', 'kept', 'saved', 'failed')}
+    logger.info(f"  TOTAL: fetched={totals['fetched']} kept={totals['kept']} saved={totals['saved']} failed={totals['failed']}")
 
 def test_database_connection():
     """Test the database connection and show sample data"""
@@ -128,15 +308,38 @@ if __name__ == "__main__":
     parser.add_argument('--full', action='store_true', help='Run in full mode (all classes)')
     parser.add_argument('--test-db', action='store_true', help='Test database connection only')
     parser.add_argument('--semester', default='202510', help='Semester code (default: 202510 for Spring 2025)')
+    parser.add_argument('--semesters', help='Comma-separated semester codes to load in parallel (e.g. 202510,202520,202530)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --semesters (default: one per semester)')
+    parser.add_argument('--seats-only', action='store_true', help='Only refresh availableSeats/totalSeats for existing sections')
+    parser.add_argument('--changed-ids-dir', default=None, help='Directory to write changed-<semester>.json listing the class IDs written')
+    parser.add_argument('--parse-workers', type=int, default=None, help='Processes for parsing rows (default: parse in the loader process)')
+    parser.add_argument('--stream', action='store_true', help='Request large pages and decode rows incrementally off the response stream')
+    parser.add_argument('--page-size', type=int, default=None, help=f'Rows per ClassNav request (default: 1000, or {STREAMED_PAGE_SIZE} with --stream)')
+    parser.add_argument('--direct', action='store_true', help='Upsert full loads straight into the live tables instead of staging them')
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR, help=f"Directory for the JSON run report (default: {DEFAULT_REPORT_DIR}; '' to skip)")
+    parser.add_argument('--concurrency', type=int, default=None, help='Concurrent page requests in full mode (default: CLASSNAV_CONCURRENCY or 4)')
     
     args = parser.parse_args()
     
     if args.test_db:
         test_database_connection()
+    elif args.seats_only:
+        refresh_seats(semester=args.semester, concurrency=args.concurrency, report_dir=args.report_dir)
+    elif args.semesters:
+        semesters = [s.strip() for s in args.semesters.split(',') if s.strip()]
+        load_semesters_in_parallel(semesters, test_mode=not args.full, concurrency=args.concurrency, workers=args.workers,
+                                   changed_ids_dir=args.changed_ids_dir, staged=not args.direct,
+                                   report_dir=args.report_dir)
     elif args.test:
-        load_classes_to_database(test_mode=True, semester=args.semester)
+        load_classes_to_database(test_mode=True, semester=args.semester, concurrency=args.concurrency, changed_ids_dir=args.changed_ids_dir,
+                                 parse_workers=args.parse_workers, page_size=args.page_size, stream=args.stream,
+                                 report_dir=args.report_dir)
     elif args.full:
-        load_classes_to_database(test_mode=False, semester=args.semester)
+        load_classes_to_database(test_mode=False, semester=args.semester, concurrency=args.concurrency, changed_ids_dir=args.changed_ids_dir,
+                                 parse_workers=args.parse_workers, page_size=args.page_size, stream=args.stream,
+                                 staged=not args.direct, report_dir=args.report_dir)
     else:
         # Default to test mode
-        load_classes_to_database(test_mode=True, semester=args.semester)
\ No newline at end of file
+        load_classes_to_database(test_mode=True, semester=args.semester, concurrency=args.concurrency, changed_ids_dir=args.changed_ids_dir,
+                                 parse_workers=args.parse_workers, page_size=args.page_size, stream=args.stream,
+                                 report_dir=args.report_dir)
\ No newline at end of file
@@ -0,0 +1,57 @@
+import queue
+import threading
+from typing import Any, Iterable, Iterator, List
+
+_ITEM, _DONE, _ERROR = 'item', 'done', 'error'
+
+
+def buffered(iterable: Iterable[Any], maxsize: int = 2, name: str = 'pipeline-stage') -> Iterator[Any]:
+    """
+    Run `iterable` on a background thread, handing items over through a queue of at most `maxsize`.
+    The producer runs ahead of the consumer by that many items and no further, so stages overlap
+    while memory stays bounded. Producer exceptions are re-raised in the consumer.
+    """
+    handoff = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(message) -> bool:
+        while not stopped.is_set():
+            try:
+                handoff.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((_ITEM, item)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_ERROR, e))
+
+    threading.Thread(target=produce, name=name, daemon=True).start()
+    try:
+        while True:
+            kind, value = handoff.get()
+            if kind == _DONE:
+                return
+            if kind == _ERROR:
+                raise value
+            yield value
+    finally:
+        # Lets the producer exit if the consumer stops early
+        stopped.set()
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
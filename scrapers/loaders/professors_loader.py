@@ -1,7 +1,9 @@
-import requests
 import os
 import logging
+import threading
 import time
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv('./scrapers/.env')
@@ -11,6 +13,13 @@ from scrapers.processors.professors_processor import ProfessorDataProcessor
 from scrapers.clients.database_client import SQLAlchemyDatabaseClient
 from scrapers.config.api_config import APIConfig, EndpointConfig
 from scrapers.config.queries import QueryTemplates
+from scrapers.loaders.checkpoint import CrawlCheckpoint
+from scrapers.loaders.run_report import RunReport, DEFAULT_REPORT_DIR, write_run_report
+
+DEFAULT_CHECKPOINT_PATH = 'scrapers/checkpoints/professors_detailed.json'
+
+# Professors whose details are committed (and checkpointed) together
+DETAIL_FLUSH_SIZE = 100
 
 def setup_logging():
     logging.basicConfig(
@@ -20,98 +29,279 @@ def setup_logging():
     )
     return logging.getLogger(__name__)
 
-def fetch_basic_professors(logger):
+def fetch_basic_professors(logger, api_client: RateMyProfessorsAPIClient):
     logger.info("Fetching basic professor data...")
     
     all_teachers = []
     has_next_page = True
     after_cursor = None
     
-    headers = APIConfig.get_browser_headers()
     query_template = QueryTemplates.get_professors_search_query()
 
     if not all([EndpointConfig.RATING_API, EndpointConfig.SCHOOL_ID, query_template]):
         logger.error("API endpoint, school ID, or query template is not configured. Aborting.")
         return []
 
+    # Request failures propagate: a truncated sweep must not be mistaken for the full list
     while has_next_page:
-        variables = QueryTemplates.get_search_variables(EndpointConfig.SCHOOL_ID)
-        variables['after'] = after_cursor
-
-        try:
-            response = requests.post(
-                EndpointConfig.RATING_API,
-                json={'query': query_template, 'variables': variables},
-                headers=headers
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if 'data' in data and data['data'] and 'search' in data['data']:
-                search_results = data['data']['search']['teachers']
-                if search_results and 'edges' in search_results:
-                    all_teachers.extend(search_results['edges'])
-                    page_info = search_results.get('pageInfo', {})
-                    has_next_page = page_info.get('hasNextPage', False)
-                    after_cursor = page_info.get('endCursor')
-                    logger.info(f"Fetched a page of {len(search_results['edges'])} professors. Total: {len(all_teachers)}. More pages: {has_next_page}")
-                else:
-                    has_next_page = False
-            else:
-                logger.error(f"Unexpected response structure: {data}")
-                has_next_page = False
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
+        search_results = api_client.fetch_professors_page(after_cursor)
+        if search_results and 'edges' in search_results:
+            all_teachers.extend(search_results['edges'])
+            page_info = search_results.get('pageInfo', {})
+            has_next_page = page_info.get('hasNextPage', False)
+            after_cursor = page_info.get('endCursor')
+            logger.info(f"Fetched a page of {len(search_results['edges'])} professors. Total: {len(all_teachers)}. More pages: {has_next_page}")
+        else:
             has_next_page = False
             
     logger.info(f"Successfully fetched a total of {len(all_teachers)} professors.")
+    logger.info(f"Ratings API throughput: {api_client.executor.throughput()}")
     return all_teachers
 
-def load_professors_to_database(test_mode: bool = True, detailed_mode: bool = False, min_ratings: int = 10):
-    logger = setup_logging()
-    data_processor = ProfessorDataProcessor()
-    db_client = SQLAlchemyDatabaseClient()
-    api_client = RateMyProfessorsAPIClient()
+def fetch_sharded_professors(logger, api_client: RateMyProfessorsAPIClient, concurrency: int = None):
+    """Crawl each department's search cursor concurrently, de-duplicating teachers by ID as pages arrive"""
+    if not all([EndpointConfig.RATING_API, EndpointConfig.SCHOOL_ID, QueryTemplates.get_professors_search_query()]):
+        logger.error("API endpoint, school ID, or query template is not configured. Aborting.")
+        return []
     
-    logger.info("STARTING PROFESSOR LOADER")
-    logger.info(f"Test mode: {test_mode}, Detailed mode: {detailed_mode}, Min ratings: {min_ratings}")
+    departments = api_client.fetch_departments()
+    if not departments:
+        logger.warning("No departments available (is DEPARTMENTS_QUERY set?); falling back to a single cursor")
+        return fetch_basic_professors(logger, api_client)
+    
+    concurrency = concurrency or api_client.max_concurrency
+    logger.info(f"Fetching professors across {len(departments)} departments with {concurrency} workers...")
     
-    teachers = fetch_basic_professors(logger)
+    teachers_by_id = {}
+    seen_lock = threading.Lock()
     
-    if not teachers:
-        logger.error("No professors fetched. Exiting.")
-        return
+    def crawl(department):
+        added = 0
+        for edges in api_client.iter_professor_pages(department['id']):
+            with seen_lock:
+                for edge in edges:
+                    teacher_id = (edge.get('node') or {}).get('id')
+                    if teacher_id and teacher_id not in teachers_by_id:
+                        teachers_by_id[teacher_id] = edge
+                        added += 1
+        return added
     
-    if test_mode:
-        teachers = teachers[:5]
+    # Request failures propagate from map(): a partial sweep must not look like the full list
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ratings-dept') as executor:
+        for department, added in zip(departments, executor.map(crawl, departments)):
+            logger.info(f"Department {department.get('name') or department['id']}: {added} new professors")
+    
+    logger.info(f"Successfully fetched a total of {len(teachers_by_id)} professors.")
+    logger.info(f"Ratings API throughput: {api_client.executor.throughput()}")
+    return list(teachers_by_id.values())
+
+def _crawl_state(professor_id, processed_prof, edges, new_ratings, previous_state):
+    """High-water mark after a crawl: the newest rating seen, or the previous mark when nothing new arrived"""
+    state = {
+        'professorId': professor_id,
+        'numRatings': processed_prof.get('numRatings') or 0,
+        'lastRatingId': None,
+        'lastRatingCursor': None,
+        'lastRatingDate': None,
+    }
+    if edges:
+        state.update({
+            'lastRatingId': new_ratings[0].get('id'),
+            'lastRatingCursor': edges[0].get('cursor'),
+            'lastRatingDate': new_ratings[0].get('date'),
+        })
+    elif previous_state:
+        state.update({key: previous_state[key] for key in ('lastRatingId', 'lastRatingCursor', 'lastRatingDate')})
+    return state
+
+def _timed_details(fetched, report: RunReport):
+    """Yield detail results, booking the time spent waiting for each to the report's details_fetch_wait stage"""
+    fetched = iter(fetched)
+    while True:
+        started = time.perf_counter()
+        result = next(fetched, None)
+        if result is None:
+            return
+        report.add_time('details_fetch_wait', time.perf_counter() - started, 1)
+        yield result
 
-    logger.info(f"Processing {len(teachers)} professors...")
+def fetch_detailed_professors(logger, api_client: RateMyProfessorsAPIClient, db_client: SQLAlchemyDatabaseClient,
+                              data_processor: ProfessorDataProcessor, professors, min_ratings: int = 10,
+                              concurrency: int = None, checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+                              batch_size: int = None, incremental: bool = True, report: RunReport = None,
+                              resume: bool = False):
+    """
+    Concurrently fetch details and ratings for professors with at least min_ratings. Each run starts a fresh
+    checkpoint; with resume it skips what an interrupted run already saved, or, if that run finished, retries
+    only the professors it failed on.
+    Incremental runs skip professors whose numRatings matches their high-water mark and stop at the newest stored rating.
+    """
+    report = report or RunReport('professors-detailed')
+    checkpoint = CrawlCheckpoint(checkpoint_path)
+    retry_only = set(checkpoint.failed) if resume and checkpoint.finished else None
+    skipped = len(checkpoint.completed) if resume and retry_only is None else 0
+    if not skipped:
+        checkpoint.start()
+    crawl_states = db_client.get_crawl_states() if incremental else {}
     
-    successful_saves, failed_saves = 0, 0
+    pending, unchanged = [], 0
+    for prof in professors:
+        num_ratings = prof.get('numRatings') or 0
+        if num_ratings < min_ratings or checkpoint.is_done(prof['id']):
+            continue
+        if retry_only is not None and prof['id'] not in retry_only:
+            continue
+        state = crawl_states.get(prof['id'])
+        if state and state['numRatings'] == num_ratings:
+            unchanged += 1
+            continue
+        pending.append((prof['id'], num_ratings))
+    known_ratings = {
+        professor_id: crawl_states[professor_id]['lastRatingId']
+        for professor_id, _ in pending
+        if professor_id in crawl_states and crawl_states[professor_id]['lastRatingId']
+    }
     
-    for i, teacher_edge in enumerate(teachers, 1):
-        try:
-            teacher = teacher_edge['node']
-            processed_prof = data_processor.process_professor_data(teacher)
-            if processed_prof and data_processor.validate_professor_data(processed_prof):
-                if db_client.save_professor(processed_prof):
-                    successful_saves += 1
-                else:
-                    failed_saves += 1
-            else:
-                failed_saves += 1
-        except Exception as e:
-            logger.error(f"Error processing professor at index {i}: {e}")
-            failed_saves += 1
+    logger.info(f"Detailed crawl: {len(pending)} professors with >= {min_ratings} ratings to fetch, {unchanged} unchanged"
+                + (f", resuming after {skipped} already done" if skipped else "")
+                + (f", retrying {len(retry_only)} failed last run" if retry_only is not None else ""))
+    
+    detailed_profs, ratings, states, batch_ids = [], [], [], []
+    results = {'professors': 0, 'ratings': 0, 'unchanged': unchanged, 'failed': 0}
+    
+    def flush():
+        with report.stage('db_write', rows=len(batch_ids)):
+            saved_profs = db_client.save_professors_bulk(detailed_profs)
+            saved_ratings = db_client.save_ratings_bulk(ratings)
+        results['professors'] += saved_profs
+        results['ratings'] += saved_ratings
+        # High-water marks move only once their ratings are stored
+        all_saved = saved_profs == len(detailed_profs) and saved_ratings == len({r['id'] for r in ratings})
+        if all_saved:
+            with report.stage('db_write'):
+                all_saved = db_client.save_crawl_states_bulk(states) == len(states)
+        # Checkpoint only committed work, so a resumed crawl never skips unsaved professors
+        if all_saved:
+            checkpoint.mark_done(batch_ids)
+        else:
+            checkpoint.mark_failed(batch_ids)
+            results['failed'] += len(batch_ids)
+        detailed_profs.clear()
+        ratings.clear()
+        states.clear()
+        batch_ids.clear()
+    
+    # Closed on the way out so an error or Ctrl-C cancels the queued detail requests
+    with closing(api_client.iter_professor_details(pending, concurrency, batch_size or APIConfig.get_details_batch_size(), known_ratings)) as fetched:
+        for i, (professor_id, details, error) in enumerate(_timed_details(fetched, report), 1):
+            if error is not None or not details:
+                logger.error(f"Failed to fetch details for professor {professor_id}: {error or 'no data'}")
+                checkpoint.mark_failed([professor_id])
+                results['failed'] += 1
+                continue
+            
+            edges = (details.get('ratings') or {}).get('edges') or []
+            with report.stage('details_parse', rows=1 + len(edges)):
+                processed_prof = data_processor.process_professor_data(details)
+                if data_processor.validate_professor_data(processed_prof):
+                    detailed_profs.append(processed_prof)
+                new_ratings = [data_processor.process_rating_data(edge.get('node') or {}, professor_id) for edge in edges]
+                ratings.extend(rating for rating in new_ratings if data_processor.validate_rating_data(rating))
+            report.count('ratings_fetched', len(edges))
+            states.append(_crawl_state(professor_id, processed_prof, edges, new_ratings, crawl_states.get(professor_id)))
+            batch_ids.append(professor_id)
+            
+            if len(batch_ids) >= DETAIL_FLUSH_SIZE:
+                flush()
+                logger.info(f"Detailed crawl progress: {i}/{len(pending)} professors, {results['ratings']} ratings saved")
+    
+    if batch_ids:
+        flush()
     
-    logger.info(f"\nBASIC LOADING RESULTS: {successful_saves} successful, {failed_saves} failed.")
+    # Every pending professor was attempted; only the failures are kept, so they can't hold the rest back
+    checkpoint.finish()
+    if results['failed']:
+        logger.warning(f"{results['failed']} professors failed; rerun with --resume to retry just those from {checkpoint_path}")
+    
+    logger.info(f"Ratings API throughput: {api_client.executor.throughput()}")
+    return results
+
+def load_professors_to_database(test_mode: bool = True, detailed_mode: bool = False, min_ratings: int = 10,
+                                concurrency: int = None, checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+                                batch_size: int = None, sharded: bool = False, incremental: bool = True,
+                                report_dir: str = DEFAULT_REPORT_DIR, resume: bool = False):
+    logger = setup_logging()
+    data_processor = ProfessorDataProcessor()
+    db_client = SQLAlchemyDatabaseClient()
+    api_client = RateMyProfessorsAPIClient(max_concurrency=concurrency)
+    report = RunReport('professors', test_mode=test_mode, detailed_mode=detailed_mode, min_ratings=min_ratings,
+                       concurrency=api_client.max_concurrency, batch_size=batch_size, sharded=sharded, incremental=incremental)
+    report.watch_engine(db_client.engine)
+    summary = {'fetched': 0, 'saved': 0, 'failed': 0, 'detailed': None, 'error': None}
     
-    if detailed_mode:
-        logger.info("\nSTARTING DETAILED LOADING")
-        # ... (detailed loading logic remains the same but will use the generic clients)
+    logger.info("STARTING PROFESSOR LOADER")
+    logger.info(f"Test mode: {test_mode}, Detailed mode: {detailed_mode}, Min ratings: {min_ratings}")
     
-    logger.info("\nPROFESSOR LOADING COMPLETE")
+    try:
+        try:
+            with report.stage('search'):
+                if sharded:
+                    teachers = fetch_sharded_professors(logger, api_client, concurrency)
+                else:
+                    teachers = fetch_basic_professors(logger, api_client)
+        except Exception as e:
+            logger.error(f"Professor search failed: {e}")
+            summary['error'] = f"Professor search failed: {e}"
+            return
+        
+        if not teachers:
+            logger.error("No professors fetched. Exiting.")
+            summary['error'] = "No professors fetched"
+            return
+        
+        if test_mode:
+            teachers = teachers[:5]
+        summary['fetched'] = len(teachers)
+
+        logger.info(f"Processing {len(teachers)} professors...")
+        
+        processed_profs = []
+        failed_saves = 0
+        
+        with report.stage('parse', rows=len(teachers)):
+            for i, teacher_edge in enumerate(teachers, 1):
+                try:
+                    teacher = teacher_edge['node']
+                    processed_prof = data_processor.process_professor_data(teacher)
+                    if processed_prof and data_processor.validate_professor_data(processed_prof):
+                        processed_profs.append(processed_prof)
+                    else:
+                        failed_saves += 1
+                except Exception as e:
+                    logger.error(f"Error processing professor at index {i}: {e}")
+                    failed_saves += 1
+        
+        with report.stage('db_write', rows=len(processed_profs)):
+            successful_saves = db_client.save_professors_bulk(processed_profs)
+        failed_saves += len(processed_profs) - successful_saves
+        summary.update({'saved': successful_saves, 'failed': failed_saves})
+        
+        logger.info(f"\nBASIC LOADING RESULTS: {successful_saves} successful, {failed_saves} failed.")
+        
+        if detailed_mode:
+            logger.info("\nSTARTING DETAILED LOADING")
+            detailed = fetch_detailed_professors(logger, api_client, db_client, data_processor, processed_profs,
+                                                 min_ratings, concurrency, checkpoint_path, batch_size, incremental, report,
+                                                 resume)
+            summary['detailed'] = detailed
+            logger.info(f"DETAILED LOADING RESULTS: {detailed['professors']} professors, "
+                        f"{detailed['ratings']} ratings saved, {detailed['unchanged']} unchanged, {detailed['failed']} failed.")
+        
+        logger.info("\nPROFESSOR LOADING COMPLETE")
+    finally:
+        db_client.engine.dispose()
+        if report_dir:
+            write_run_report(logger, report, report_dir, summary, api_client.executor)
 
 if __name__ == "__main__":
     import argparse
@@ -121,7 +311,17 @@ if __name__ == "__main__":
     parser.add_argument('--full', action='store_true', help='Run in full mode (all professors)')
     parser.add_argument('--detailed', action='store_true', help='Also fetch detailed ratings data')
     parser.add_argument('--min-ratings', type=int, default=10, help='Minimum number of ratings for detailed fetch')
+    parser.add_argument('--concurrency', type=int, default=None, help='Concurrent detail requests (default: RATINGS_CONCURRENCY or 4)')
+    parser.add_argument('--batch-size', type=int, default=None, help='Initial professors per batched details request (default: RATINGS_BATCH_SIZE or 1, unbatched)')
+    parser.add_argument('--sharded', action='store_true', help='Crawl the professor search per department in parallel (needs DEPARTMENTS_QUERY)')
+    parser.add_argument('--recrawl-all', action='store_true', help='Ignore ratings high-water marks and re-fetch every eligible professor')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help='Progress file for resuming an interrupted detailed crawl')
+    parser.add_argument('--resume', action='store_true', help='Continue the crawl in --checkpoint, or retry its failures if it finished, instead of starting fresh')
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR, help=f"Directory for the JSON run report (default: {DEFAULT_REPORT_DIR}; '' to skip)")
     
     args = parser.parse_args()
     
-    load_professors_to_database(test_mode=not args.full, detailed_mode=args.detailed, min_ratings=args.min_ratings)
\ No newline at end of file
+    load_professors_to_database(test_mode=not args.full, detailed_mode=args.detailed, min_ratings=args.min_ratings,
+                                concurrency=args.concurrency, checkpoint_path=args.checkpoint, batch_size=args.batch_size,
+                                sharded=args.sharded, incremental=not args.recrawl_all, report_dir=args.report_dir,
+                                resume=args.resume)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage
+    resource = None
+
+DEFAULT_REPORT_DIR = 'scrapers/reports'
+
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """Peak resident set size of this process, or of its finished children (e.g. a parse pool)."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is kilobytes on Linux but bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+class RunReport:
+    """
+    Per-stage wall time, row counts and counters for one loader run, written as JSON so nightly
+    runs can be compared. Stages may run on several threads; their times are summed, so a stage's
+    seconds is busy time, not its share of the run's elapsed time.
+    """
+
+    def __init__(self, loader: str, label: Optional[str] = None, **params):
+        self.loader = loader
+        self.label = label
+        self.params = params
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+        self.sections: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started, rows)
+
+    def add_time(self, name: str, seconds: float, rows: int = 0, calls: int = 1):
+        with self._lock:
+            stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'rows': 0})
+            stage['seconds'] += seconds
+            stage['calls'] += calls
+            stage['rows'] += rows
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def section(self, name: str, data: Any):
+        """Attach an already-aggregated block, such as an HTTP executor's throughput()."""
+        self.sections[name] = data
+
+    def watch_engine(self, engine):
+        """Count statements and executemany rows, and time statement execution and commits, on engine."""
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            if context is not None:
+                context._run_report_started = time.perf_counter()
+
+        def after_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, '_run_report_started', None)
+            rows = len(parameters) if executemany else 1
+            self.add_time('db_execute', time.perf_counter() - started if started else 0.0, rows)
+            self.count('db_statements')
+
+        event.listen(engine, 'before_cursor_execute', before_execute)
+        event.listen(engine, 'after_cursor_execute', after_execute)
+
+        # There is no after-commit connection event, so time the dialect's commit call itself
+        dialect = engine.dialect
+        do_commit = dialect.do_commit
+
+        def timed_commit(dbapi_connection):
+            started = time.perf_counter()
+            try:
+                do_commit(dbapi_connection)
+            finally:
+                self.add_time('db_commit', time.perf_counter() - started)
+
+        dialect.do_commit = timed_commit
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._started
+        with self._lock:
+            stages = {
+                name: {
+                    'seconds': round(stage['seconds'], 4),
+                    'calls': stage['calls'],
+                    'rows': stage['rows'],
+                    'rows_per_second': round(stage['rows'] / stage['seconds'], 1) if stage['rows'] and stage['seconds'] else None,
+                }
+                for name, stage in self.stages.items()
+            }
+            counters = dict(self.counters)
+        return {
+            'loader': self.loader,
+            'label': self.label,
+            'started_at': self.started_at.isoformat(),
+            'elapsed_seconds': round(elapsed, 3),
+            'params': self.params,
+            'stages': stages,
+            'counters': counters,
+            **self.sections,
+            'peak_rss_bytes': peak_rss_bytes(),
+            'peak_rss_children_bytes': peak_rss_bytes(children=True),
+        }
+
+    def write(self, directory: str = DEFAULT_REPORT_DIR) -> str:
+        """Write <directory>/<loader>[-<label>]-<UTC start>.json and return its path."""
+        os.makedirs(directory, exist_ok=True)
+        name = '-'.join(part for part in (self.loader, self.label, self.started_at.strftime('%Y%m%dT%H%M%SZ')) if part)
+        path = os.path.join(directory, f"{name}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+
+def write_run_report(logger, report: RunReport, report_dir: str, summary: Dict[str, Any], executor=None) -> Optional[str]:
+    """Attach the run summary and HTTP stats to the report and write it; a failed write is logged, not raised."""
+    report.section('summary', dict(summary))
+    if executor is not None:
+        report.section('http', {**executor.throughput(), 'latency_histogram': executor.latency_histogram()})
+    try:
+        path = report.write(report_dir)
+    except OSError as e:
+        logger.warning(f"Could not write run report to {report_dir}: {e}")
+        return None
+    logger.info(f"Run report written to {path}")
+    return path
@@ -1,13 +1,34 @@
+import hashlib
 import json
 import logging
+import multiprocessing
+import os
 import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from typing import Dict, List, Any, Optional
 
+# Compiled once per process instead of on every row
+SEAT_PATTERN = re.compile(r'(\d+)\s+out\s+of\s+(\d+)')
+PREREQ_PATTERNS = (
+    re.compile(r'Prerequisite[s]?:\s*([^.]*(?:\.[^A-Z][^.]*)*)', re.IGNORECASE),  # Main pattern
+    re.compile(r'Prerequisites?:\s*([^.]+\.)', re.IGNORECASE),  # Alternative with period
+)
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+COURSE_CODE_PATTERN = re.compile(r'([A-Z]{2,5})\s+G?(\d{4})')
+COURSE_NUMBER_PATTERN = re.compile(r'\b(\d{4})\b')
+
+# Rows per task sent to a parse worker; large enough to amortise pickling
+PARALLEL_CHUNK_SIZE = 250
+
 class ClassDataProcessor:
     """Process raw class data into database-ready format"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # Time spent in parse_prerequisites in this process, for the loader's run report
+        self.prerequisite_seconds = 0.0
         
         # Field mapping based on actual API response
         self.FIELD_MAPPING = {
@@ -75,10 +96,7 @@ class ClassDataProcessor:
             return {'available_seats': 0, 'total_seats': 0}
         
         # Extract "X out of Y" from HTML like "<span data-failsafe='6 out of 48' class='loading'> </span>"
-        import re
-        
-        # Look for pattern like "X out of Y" in the HTML
-        match = re.search(r'(\d+)\s+out\s+of\s+(\d+)', seat_html)
+        match = SEAT_PATTERN.search(seat_html)
         if match:
             available_seats = int(match.group(1))
             total_seats = int(match.group(2))
@@ -87,14 +105,29 @@ class ClassDataProcessor:
         # If no match found, return zeros
         return {'available_seats': 0, 'total_seats': 0}
     
+    def extract_seat_update(self, class_array: List[Any]) -> Optional[Dict[str, Any]]:
+        """Pull just the class ID and seat counts from a raw API array, skipping full parsing"""
+        class_id = class_array[1] if len(class_array) > 1 else None
+        if not class_id:
+            return None
+        seat_html = class_array[12] if len(class_array) > 12 else ''
+        seat_data = self.parse_seat_availability(seat_html or '')
+        return {
+            'id': class_id,
+            'availableSeats': seat_data['available_seats'],
+            'totalSeats': seat_data['total_seats'],
+        }
+    
     def parse_class_data(self, class_array: List[Any]) -> Dict[str, Any]:
         """Convert API array to structured class object"""
         class_data = {}
         
+        row_length = len(class_array)
         for index, field in self.FIELD_MAPPING.items():
-            value = class_array[int(index)] if int(index) < len(class_array) else None
-            if value and value != '' and value is not None:
-                class_data[field] = value
+            if index < row_length:
+                value = class_array[index]
+                if value:
+                    class_data[field] = value
         
         # Parse seat availability data
         seat_data = self.parse_seat_availability(class_data.get('seat_availability', ''))
@@ -108,7 +141,7 @@ class ClassDataProcessor:
                 class_data.get('subject', '')
             )
         
-        return {
+        processed = {
             'id': class_data.get('class_id'),
             'subject': class_data.get('subject', ''),
             'courseNumber': class_data.get('course_number', ''),
@@ -130,6 +163,14 @@ class ClassDataProcessor:
             'totalSeats': class_data.get('total_seats', 0),
             'prerequisites': prerequisites  # Add parsed prerequisites
         }
+        processed['contentHash'] = self.compute_content_hash(processed)
+        return processed
+    
+    def compute_content_hash(self, processed_class: Dict[str, Any]) -> str:
+        """Stable hash of a processed class's fields, meeting times and prerequisites included"""
+        content = {key: value for key, value in processed_class.items() if key != 'contentHash'}
+        encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
     
     def process_meeting_time_data(self, raw_meeting_time_data: Dict[str, Any], class_id: str) -> Dict[str, Any]:
         """Process raw meeting time data for database storage"""
@@ -175,6 +216,7 @@ class ClassDataProcessor:
         if not description:
             return []
         
+        started = time.perf_counter()
         try:
             # Extract prerequisite text
             prereq_text = self._extract_prerequisite_text(description)
@@ -186,16 +228,13 @@ class ClassDataProcessor:
         except Exception as e:
             self.logger.error(f"Error parsing prerequisites: {e}")
             return []
+        finally:
+            self.prerequisite_seconds += time.perf_counter() - started
     
     def _extract_prerequisite_text(self, description: str) -> str:
         """Extract the prerequisite section from description"""
-        prereq_patterns = [
-            r'Prerequisite[s]?:\s*([^.]*(?:\.[^A-Z][^.]*)*)',  # Main pattern
-            r'Prerequisites?:\s*([^.]+\.)',  # Alternative with period
-        ]
-        
-        for pattern in prereq_patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
+        for pattern in PREREQ_PATTERNS:
+            match = pattern.search(description)
             if match:
                 return match.group(1).strip()
         return ""
@@ -229,10 +268,10 @@ class ClassDataProcessor:
     def _clean_prereq_text(self, text: str) -> str:
         """Clean and normalize the prerequisite text"""
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        text = HTML_TAG_PATTERN.sub('', text)
         
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_PATTERN.sub(' ', text)
         
         # Remove extra punctuation at the end
         text = text.rstrip('.')
@@ -244,14 +283,14 @@ class ClassDataProcessor:
         courses = []
         
         # Standard format: SUBJ ####
-        matches = re.findall(r'([A-Z]{2,5})\s+G?(\d{4})', text)
+        matches = COURSE_CODE_PATTERN.findall(text)
         for subject, number in matches:
             courses.append({'subject': subject, 'number': number})
         
         # Handle number-only references (like "1113" when subject is implied)
         if class_subject:
             # Look for standalone numbers that might be course numbers
-            number_matches = re.findall(r'\b(\d{4})\b', text)
+            number_matches = COURSE_NUMBER_PATTERN.findall(text)
             for number in number_matches:
                 # Only add if not already found with a subject
                 if not any(c['number'] == number for c in courses):
@@ -306,6 +345,25 @@ class ClassDataProcessor:
         
         return processed_classes
     
+    def process_classes_parallel(self, classes_data: List[List[Any]], workers: Optional[int] = None,
+                                 executor: Optional[Executor] = None,
+                                 chunk_size: int = PARALLEL_CHUNK_SIZE) -> List[Dict[str, Any]]:
+        """
+        process_classes_batch sharded across a process pool, results in input order. Pass a
+        long-lived executor (see create_parse_pool) when parsing many pages; otherwise a pool of
+        `workers` is created for this call. Small inputs are parsed inline.
+        """
+        if len(classes_data) <= chunk_size or (executor is None and (workers or 0) <= 1):
+            return self.process_classes_batch(classes_data)
+        
+        chunks = [classes_data[start:start + chunk_size] for start in range(0, len(classes_data), chunk_size)]
+        if executor is not None:
+            results = executor.map(_process_chunk, chunks)
+            return [class_data for chunk in results for class_data in chunk]
+        
+        with create_parse_pool(workers) as pool:
+            return [class_data for chunk in pool.map(_process_chunk, chunks) for class_data in chunk]
+    
     def extract_credits_from_course_number(self, course_number: str) -> int:
         """Extract credit hours from course number (e.g., ENGR 1401 = 1 credit, ECE 2214 = 4 credits)"""
         if not course_number:
@@ -347,4 +405,18 @@ class ClassDataProcessor:
                 self.logger.warning(f"Missing required field '{field}' in meeting time data")
                 return False
         
-        return True 
\ No newline at end of file
+        return True 
+
+
+_worker_processor: Optional[ClassDataProcessor] = None
+
+def _process_chunk(rows: List[List[Any]]) -> List[Dict[str, Any]]:
+    # One processor per worker process, reused across chunks
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = ClassDataProcessor()
+    return _worker_processor.process_classes_batch(rows)
+
+def create_parse_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool for process_classes_parallel; spawned so it is safe alongside loader threads"""
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=multiprocessing.get_context('spawn'))
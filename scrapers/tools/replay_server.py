@@ -0,0 +1,63 @@
+import base64
+import logging
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scrapers.clients.cassette import Cassette, REPLAY, cassette_key
+from scrapers.config.api_config import APIConfig
+
+
+def make_handler(cassette: Cassette):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        """Answers any recorded GET/POST from the cassette; unknown requests get a 404."""
+
+        def do_GET(self):
+            self._serve(b'')
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self._serve(self.rfile.read(length) if length else b'')
+
+        def _serve(self, body: bytes):
+            entry = cassette.load_entry(cassette_key(self.command, self.path, body))
+            if entry is None:
+                self.send_error(404, 'No recording for this request')
+                return
+            recorded = entry['response']
+            content = base64.b64decode(recorded['body'])
+            self.send_response(recorded['status'])
+            for name, value in (recorded.get('headers') or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            logging.getLogger(__name__).debug(format % args)
+
+    return ReplayHandler
+
+
+def serve(directory: str, host: str = '127.0.0.1', port: int = 8765):
+    server = ThreadingHTTPServer((host, port), make_handler(Cassette(directory, REPLAY)))
+    logging.getLogger(__name__).info(f"Serving recordings from {directory} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve recorded ClassNav/ratings responses as a local stand-in API.')
+    parser.add_argument('--dir', default=APIConfig.get_cassette_dir(), help='Cassette directory (default: HTTP_CASSETTE_DIR)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stdout)
+    serve(args.dir, args.host, args.port)